@@ -1,18 +1,31 @@
 import os
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, Header, HTTPException, Path, Query
+from fastapi.responses import StreamingResponse
+from sqlalchemy import select, update
 from sqlalchemy.orm import Session
-from typing import List, Dict, Any, Optional
-from datetime import datetime
+from typing import List, Dict, Any, Optional, Tuple
+from datetime import datetime, timedelta
 from functools import lru_cache
+from contextlib import asynccontextmanager
 from pydantic import BaseModel
 
+from backend.app.api.fast_json import FastJSONResponse, rows_to_dicts
 from backend.app.db.database import get_db
-from backend.app.db.models import Task, ExecutionLog
+from backend.app.db.models import Plan, Task, ExecutionLog, TASK_LIST_COLUMNS, LOG_LIST_COLUMNS
+from backend.app.db.search import search
+from backend.app.db.idempotency import IdempotencyKeyReused, get_stored_response, store_response
+from backend.app.db.export import gzip_stream, iter_csv, iter_ndjson
+from backend.app.db.stats import get_stats, record_bulk_transition, record_execution, record_task_transition
 from backend.app.core.agents import PlannerAgent, RoleAgent
 from backend.app.core.n8n_integration import N8NIntegration
+from backend.app.core.admission import LANE_BULK, LANE_HIGH, LANE_NORMAL, AdmissionRejected, llm_admission
+from backend.app.core.deadline import REQUEST_DEADLINE_SECONDS, DeadlineExceeded
 
 router = APIRouter()
 
+# An approval still "approved" after this long was abandoned mid-run and may be claimed again
+APPROVAL_LEASE_SECONDS = float(os.getenv("APPROVAL_LEASE_SECONDS", str(2 * REQUEST_DEADLINE_SECONDS)))
+
 class PlanRequest(BaseModel):
     goal: Optional[str] = None
     message: Optional[str] = None
@@ -45,8 +58,41 @@ def _normalize_tasks(tasks_raw: Any, target: str) -> List[Dict[str, Any]]:
         ]
     return tasks
 
-@router.post("/create-plan")
-async def create_launch_plan(payload: Optional[PlanRequest] = None, goal: Optional[str] = None, db: Session = Depends(get_db)):
+@asynccontextmanager
+async def _admission(cls: str, lane: int):
+    try:
+        async with llm_admission.admit(cls, lane):
+            yield
+    except AdmissionRejected as e:
+        raise HTTPException(status_code=e.status_code, detail=e.reason, headers={"Retry-After": str(e.retry_after)})
+
+async def admit_plan():
+    """Admission control for plan creation; lowest lane, shed first under load"""
+    async with _admission("plan", LANE_BULK):
+        yield
+
+def approval_lane(task_id: str, idempotency_key: Optional[str] = Header(None), db: Session = Depends(get_db)) -> Optional[int]:
+    """Admission lane for an approval, or None when it won't run the LLM (sync: runs in the threadpool).
+    Replays, unknown tasks and tasks already past "pending" are answered without taking a slot."""
+    if _stored_approval(db, idempotency_key, task_id) is not None:
+        return None
+    row = db.query(Task.status, Task.priority).filter(Task.task_id == task_id).first()
+    if row is None or row.status not in ("pending", "approved"):
+        return None
+    return LANE_HIGH if row.priority == "high" else LANE_NORMAL
+
+async def admit_approval(lane: Optional[int] = Depends(approval_lane)):
+    """Admission control for approvals; high-priority tasks jump the queue"""
+    if lane is None:
+        yield
+        return
+    async with _admission("approve", lane):
+        yield
+
+# LLM-backed endpoints are sync so their blocking LLM/webhook calls run in the threadpool,
+# leaving the event loop free to queue and shed requests in the admission dependencies
+@router.post("/create-plan", dependencies=[Depends(admit_plan)])
+def create_launch_plan(payload: Optional[PlanRequest] = None, goal: Optional[str] = None, db: Session = Depends(get_db)):
     """Create a launch plan; accepts ?goal=... or JSON {goal|message}. Saves tasks to DB and returns them."""
     target = (payload.goal if payload else None) or (payload.message if payload else None) or goal
     if not target:
@@ -61,10 +107,13 @@ async def create_launch_plan(payload: Optional[PlanRequest] = None, goal: Option
 
     tasks_norm = _normalize_tasks(tasks_raw, target)
 
-    # Persist tasks
+    # Persist the plan and its tasks
     saved = []
     now = datetime.utcnow()
     try:
+        plan = Plan(goal=target, created_at=now, updated_at=now)
+        db.add(plan)
+        db.flush()  # get PK
         for idx, t in enumerate(tasks_norm, start=1):
             role = t.get("role") or "General"
             desc = t.get("description") or t.get("text") or t.get("title") or "Task"
@@ -78,7 +127,8 @@ async def create_launch_plan(payload: Optional[PlanRequest] = None, goal: Option
             status = "pending"
 
             task = Task(
-                task_id=f"TASK-{int(now.timestamp())}-{idx}",
+                task_id=f"TASK-P{plan.id}-{idx}",
+                plan_id=plan.id,
                 role=role,
                 description=str(desc),
                 deadline=deadline,
@@ -89,9 +139,11 @@ async def create_launch_plan(payload: Optional[PlanRequest] = None, goal: Option
             )
             db.add(task)
             db.flush()  # get PK
+            record_task_transition(db, role, None, status, plan.id)
             saved.append({
                 "id": task.id,
                 "task_id": task.task_id,
+                "plan_id": task.plan_id,
                 "role": task.role,
                 "description": task.description,
                 "deadline": task.deadline.isoformat() if task.deadline else None,
@@ -107,36 +159,65 @@ async def create_launch_plan(payload: Optional[PlanRequest] = None, goal: Option
     # Frontend expects top-level "message" and "tasks"
     return {
         "message": "Plan created",
+        "plan_id": plan.id,
         "tasks": saved
     }
 
-@router.get("/tasks")
+
+@router.get("/tasks", response_class=FastJSONResponse)
 async def get_tasks(db: Session = Depends(get_db)):
-    tasks = db.query(Task).all()
-    return [
-        {
-            "id": task.id,
-            "task_id": task.task_id,
-            "role": task.role,
-            "description": task.description,
-            "deadline": task.deadline.isoformat() if task.deadline else None,
-            "priority": task.priority,
-            "status": task.status,
-            "created_at": task.created_at.isoformat() if task.created_at else None
-        }
-        for task in tasks
-    ]
-
-@router.post("/tasks/{task_id}/approve")
-async def approve_task(task_id: str, db: Session = Depends(get_db)):
-    task = db.query(Task).filter(Task.task_id == task_id).first()
-    if not task:
-        raise HTTPException(status_code=404, detail="Task not found")
+    # Plain row tuples + orjson: no ORM hydration or per-row isoformat()
+    rows = db.execute(select(*TASK_LIST_COLUMNS)).all()
+    return FastJSONResponse(rows_to_dicts([c.key for c in TASK_LIST_COLUMNS], rows))
 
-    now = datetime.utcnow()
-    task.status = "approved"
-    task.updated_at = now
+def _claim_task(db: Session, task: Task, from_status: str, to_status: str, now: datetime) -> bool:
+    """Move a task from from_status to to_status with a conditional UPDATE (no commit).
+    Returns False if another request moved it first."""
+    claimed = (
+        db.query(Task)
+        .filter(Task.id == task.id, Task.status == from_status)
+        .update({Task.status: to_status, Task.updated_at: now}, synchronize_session=False)
+    )
+    if claimed:
+        record_task_transition(db, task.role, from_status, to_status, task.plan_id)
+    return bool(claimed)
 
+def _transition_task(db: Session, task: Task, from_status: str, to_status: str, now: datetime) -> None:
+    """Atomically move a task from from_status to to_status and commit,
+    so concurrent or repeated requests can't both act on it. Raises 409 if it already moved on."""
+    if not _claim_task(db, task, from_status, to_status, now):
+        db.rollback()
+        db.refresh(task)
+        raise HTTPException(status_code=409, detail=f"Task {task.task_id} is already {task.status}")
+    db.commit()
+    db.refresh(task)
+
+def _stored_approval(db: Session, idempotency_key: Optional[str], task_id: str) -> Optional[Dict[str, Any]]:
+    """Replayable response for this key and task; 422 if the key was used for another task."""
+    if not idempotency_key:
+        return None
+    try:
+        return get_stored_response(db, idempotency_key, task_id)
+    except IdempotencyKeyReused as e:
+        raise HTTPException(status_code=422, detail=str(e))
+
+def _reclaim_stale_approval(db: Session, task: Task, now: datetime) -> bool:
+    """Take over an approval left in "approved" past its lease (e.g. the worker died mid-run)."""
+    reclaimed = (
+        db.query(Task)
+        .filter(
+            Task.id == task.id,
+            Task.status == "approved",
+            Task.updated_at < now - timedelta(seconds=APPROVAL_LEASE_SECONDS),
+        )
+        .update({Task.updated_at: now}, synchronize_session=False)
+    )
+    db.commit()
+    db.refresh(task)
+    return bool(reclaimed)
+
+def _execute_task(task: Task) -> Tuple[str, Dict[str, Any], str]:
+    """Generate the role content and fire the n8n workflow; returns (status, details, workflow name)."""
     exec_status = "failed"
     exec_details: Dict[str, Any] = {}
     content = None
@@ -145,12 +226,18 @@ async def approve_task(task_id: str, db: Session = Depends(get_db)):
     try:
         role_agent = RoleAgent(task.role)
         content = role_agent.generate_content(task.description)
+    except DeadlineExceeded as e:
+        # Out of time: don't spend the rest of the budget posting an empty payload
+        exec_details["role_agent_error"] = str(e)
+        exec_details["reason"] = "deadline_exceeded"
     except Exception as e:
         exec_details["role_agent_error"] = str(e)
 
     try:
         role_key = (task.role or "general").strip().lower()
         workflow_name = get_n8n_integration().map_task_to_workflow(role_key, "default")
+        if exec_details.get("reason") == "deadline_exceeded":
+            return exec_status, exec_details, str(workflow_name)
         result = get_n8n_integration().trigger_workflow(workflow_name, {
             "task_id": task.task_id,
             "role": task.role,
@@ -162,22 +249,71 @@ async def approve_task(task_id: str, db: Session = Depends(get_db)):
     except Exception as e:
         exec_details["n8n_error"] = str(e)
 
+    return exec_status, exec_details, str(workflow_name)
+
+def _finish_approval(db: Session, task: Task, started: datetime, exec_status: str, exec_details: Dict[str, Any], workflow_name: str) -> None:
+    """Write the execution log and move the task out of "approved" in one transaction."""
     log = ExecutionLog(
         task_id=task.task_id,
-        workflow_name=str(workflow_name),
+        workflow_name=workflow_name,
         execution_status=exec_status,
         execution_details=str(exec_details),
-        executed_at=now,
+        executed_at=started,
     )
     db.add(log)
     task.status = "completed" if exec_status == "success" else "failed"
+    task.updated_at = datetime.utcnow()
+    record_task_transition(db, task.role, "approved", task.status, task.plan_id)
+    record_execution(db, workflow_name, exec_status == "success", (task.updated_at - started).total_seconds())
     db.commit()
 
-    return {
+@router.post("/tasks/{task_id}/approve", dependencies=[Depends(admit_approval)])
+def approve_task(task_id: str, idempotency_key: Optional[str] = Header(None), db: Session = Depends(get_db)):
+    stored = _stored_approval(db, idempotency_key, task_id)
+    if stored is not None:
+        return stored
+
+    task = db.query(Task).filter(Task.task_id == task_id).first()
+    if not task:
+        raise HTTPException(status_code=404, detail="Task not found")
+
+    now = datetime.utcnow()
+    try:
+        _transition_task(db, task, "pending", "approved", now)
+    except HTTPException:
+        # A concurrent request with the same key may have finished in the meantime
+        stored = _stored_approval(db, idempotency_key, task_id)
+        if stored is not None:
+            return stored
+        if task.status != "approved" or not _reclaim_stale_approval(db, task, now):
+            raise
+
+    exec_status, exec_details, workflow_name = _execute_task(task)
+
+    try:
+        _finish_approval(db, task, now, exec_status, exec_details, workflow_name)
+    except Exception as e:
+        # Never leave the task stuck in "approved": record it as failed in a fresh transaction
+        db.rollback()
+        exec_status = "failed"
+        exec_details["finalize_error"] = str(e)
+        try:
+            _finish_approval(db, task, now, exec_status, exec_details, workflow_name)
+        except Exception:
+            db.rollback()
+            raise HTTPException(
+                status_code=500,
+                detail=f"Failed to record execution of {task_id}; it can be approved again after {APPROVAL_LEASE_SECONDS:.0f}s"
+            )
+
+    response = {
         "status": "success",
         "message": f"Task {task_id} approved and executed",
         "execution_result": {"status": exec_status, "details": exec_details}
     }
+    if idempotency_key:
+        store_response(db, idempotency_key, task_id, response)
+    return response
 
 @router.post("/tasks/{task_id}/reject")
 async def reject_task(task_id: str, db: Session = Depends(get_db)):
@@ -186,30 +322,172 @@ async def reject_task(task_id: str, db: Session = Depends(get_db)):
     if not task:
         raise HTTPException(status_code=404, detail="Task not found")
     
-    task.status = "rejected"
-    task.updated_at = datetime.now()
-    db.commit()
+    _transition_task(db, task, "pending", "rejected", datetime.now())
     
     return {
         "status": "success",
         "message": f"Task {task_id} rejected"
     }
 
-@router.get("/logs")
+def _plan_dict(plan: Plan) -> Dict[str, Any]:
+    return {
+        "id": plan.id,
+        "goal": plan.goal,
+        "total_tasks": plan.total_tasks,
+        "pending_tasks": plan.pending_tasks,
+        "approved_tasks": plan.approved_tasks,
+        "completed_tasks": plan.completed_tasks,
+        "failed_tasks": plan.failed_tasks,
+        "rejected_tasks": plan.rejected_tasks,
+        "created_at": plan.created_at.isoformat() if plan.created_at else None,
+        "updated_at": plan.updated_at.isoformat() if plan.updated_at else None
+    }
+
+def _get_plan(db: Session, plan_id: int) -> Plan:
+    plan = db.get(Plan, plan_id)
+    if not plan:
+        raise HTTPException(status_code=404, detail="Plan not found")
+    return plan
+
+@router.get("/plans")
+async def list_plans(limit: int = Query(20, ge=1, le=100), offset: int = Query(0, ge=0), db: Session = Depends(get_db)):
+    """Most recent plans first, with their progress counters"""
+    plans = db.query(Plan).order_by(Plan.id.desc()).offset(offset).limit(limit).all()
+    return [_plan_dict(plan) for plan in plans]
+
+@router.get("/plans/{plan_id}")
+async def get_plan(plan_id: int, db: Session = Depends(get_db)):
+    return _plan_dict(_get_plan(db, plan_id))
+
+@router.get("/plans/{plan_id}/tasks", response_class=FastJSONResponse)
+async def get_plan_tasks(
+    plan_id: int,
+    status: Optional[str] = None,
+    role: Optional[str] = None,
+    db: Session = Depends(get_db),
+):
+    """Tasks of one plan, read through the plan_id index"""
+    _get_plan(db, plan_id)
+    stmt = select(*TASK_LIST_COLUMNS).where(Task.plan_id == plan_id).order_by(Task.id)
+    if status:
+        stmt = stmt.where(Task.status == status)
+    if role:
+        stmt = stmt.where(Task.role == role)
+    rows = db.execute(stmt).all()
+    return FastJSONResponse(rows_to_dicts([c.key for c in TASK_LIST_COLUMNS], rows))
+
+def _reject_pending_tasks(db: Session, plan_id: int, now: datetime) -> List[Any]:
+    """Reject the plan's pending tasks in one UPDATE (no commit); returns (task_id, role) of each."""
+    stmt = (
+        update(Task)
+        .where(Task.plan_id == plan_id, Task.status == "pending")
+        .values(status="rejected", updated_at=now)
+        .execution_options(synchronize_session=False)
+    )
+    if db.get_bind().dialect.update_returning:
+        return db.execute(stmt.returning(Task.task_id, Task.role)).all()
+    # No UPDATE ... RETURNING: lock the rows we read so the UPDATE moves exactly those
+    rows = (
+        db.query(Task.id, Task.task_id, Task.role)
+        .filter(Task.plan_id == plan_id, Task.status == "pending")
+        .with_for_update()
+        .all()
+    )
+    if rows:
+        db.execute(stmt.where(Task.id.in_([row.id for row in rows])))
+    return rows
+
+@router.post("/plans/{plan_id}/tasks/reject")
+async def reject_plan_tasks(plan_id: int, db: Session = Depends(get_db)):
+    """Reject every task of the plan that is still pending"""
+    _get_plan(db, plan_id)
+    now = datetime.now()
+    rows = _reject_pending_tasks(db, plan_id, now)
+    counts_by_role: Dict[str, int] = {}
+    for row in rows:
+        counts_by_role[row.role] = counts_by_role.get(row.role, 0) + 1
+    record_bulk_transition(db, counts_by_role, "pending", "rejected", plan_id)
+    db.commit()
+    rejected = [row.task_id for row in rows]
+    return {
+        "status": "success",
+        "message": f"Rejected {len(rejected)} task(s) of plan {plan_id}",
+        "task_ids": rejected
+    }
+
+@router.get("/logs", response_class=FastJSONResponse)
 async def get_execution_logs(db: Session = Depends(get_db)):
     """Get execution logs"""
-    logs = db.query(ExecutionLog).order_by(ExecutionLog.executed_at.desc()).all()
-    return [
-        {
-            "id": log.id,
-            "task_id": log.task_id,
-            "workflow_name": log.workflow_name,
-            "execution_status": log.execution_status,
-            "execution_details": log.execution_details,
-            "executed_at": log.executed_at.isoformat() if log.executed_at else None
-        }
-        for log in logs
-    ]
+    rows = db.execute(select(*LOG_LIST_COLUMNS).order_by(ExecutionLog.executed_at.desc())).all()
+    return FastJSONResponse(rows_to_dicts([c.key for c in LOG_LIST_COLUMNS], rows))
+
+@router.get("/search")
+async def search_records(
+    q: str = Query(..., min_length=1),
+    scope: str = Query("tasks", pattern="^(tasks|logs)$"),
+    role: Optional[str] = None,
+    status: Optional[str] = None,
+    limit: int = Query(20, ge=1, le=100),
+    offset: int = Query(0, ge=0),
+    db: Session = Depends(get_db),
+):
+    """Ranked full-text search over task descriptions (scope=tasks) or execution log details (scope=logs)"""
+    total, rows = search(db, q, scope=scope, role=role, status=status, limit=limit, offset=offset)
+    if scope == "tasks":
+        results = [
+            {
+                "id": r["id"],
+                "task_id": r["task_id"],
+                "plan_id": r["plan_id"],
+                "role": r["role"],
+                "description": r["description"],
+                "deadline": r["deadline"].isoformat() if r["deadline"] else None,
+                "priority": r["priority"],
+                "status": r["status"],
+                "created_at": r["created_at"].isoformat() if r["created_at"] else None,
+                "rank": r["rank"],
+            }
+            for r in rows
+        ]
+    else:
+        results = [
+            {
+                "id": r["id"],
+                "task_id": r["task_id"],
+                "workflow_name": r["workflow_name"],
+                "execution_status": r["execution_status"],
+                "execution_details": r["execution_details"],
+                "executed_at": r["executed_at"].isoformat() if r["executed_at"] else None,
+                "rank": r["rank"],
+            }
+            for r in rows
+        ]
+    return {"query": q, "scope": scope, "total": total, "limit": limit, "offset": offset, "results": results}
+
+@router.get("/stats")
+async def get_dashboard_stats(db: Session = Depends(get_db)):
+    """Task counts by status/role and per-workflow success rate and latency, from summary tables"""
+    return get_stats(db)
+
+@router.get("/export/{dataset}")
+def export_dataset(
+    dataset: str = Path(..., pattern="^(tasks|logs)$"),
+    format: str = Query("ndjson", pattern="^(ndjson|csv)$"),
+    gzip: bool = False,
+):
+    """Stream a full dump of tasks or execution logs as NDJSON or CSV, read in fixed-size chunks"""
+    body = iter_ndjson(dataset) if format == "ndjson" else iter_csv(dataset)
+    media_type = "application/x-ndjson" if format == "ndjson" else "text/csv"
+    filename = f"{dataset}.{format}"
+    if gzip:
+        body = gzip_stream(body)
+        media_type = "application/gzip"
+        filename += ".gz"
+    return StreamingResponse(
+        body,
+        media_type=media_type,
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'},
+    )
 
 # Optional: test a webhook directly via backend
 @router.post("/n8n/test")
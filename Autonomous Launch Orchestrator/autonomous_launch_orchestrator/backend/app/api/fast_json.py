@@ -0,0 +1,30 @@
+from typing import Any, Sequence
+from fastapi.responses import Response
+
+try:
+    import orjson
+except ImportError:  # optional; falls back to the stdlib encoder
+    orjson = None
+    import json
+
+def _default(value: Any) -> Any:
+    if hasattr(value, "isoformat"):
+        return value.isoformat()
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+def dumps(content: Any) -> bytes:
+    if orjson is not None:
+        # Naive datetimes serialize exactly like datetime.isoformat()
+        return orjson.dumps(content)
+    return json.dumps(content, default=_default, separators=(",", ":")).encode()
+
+def rows_to_dicts(keys: Sequence[str], rows: Sequence[Sequence[Any]]) -> list:
+    """Zip plain row tuples (e.g. from select(Model.col, ...)) into dicts without ORM hydration."""
+    return [dict(zip(keys, row)) for row in rows]
+
+class FastJSONResponse(Response):
+    """JSON response encoded with orjson when installed, skipping FastAPI's jsonable_encoder pass."""
+    media_type = "application/json"
+
+    def render(self, content: Any) -> bytes:
+        return dumps(content)
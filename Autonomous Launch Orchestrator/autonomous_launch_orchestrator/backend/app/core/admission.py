@@ -0,0 +1,114 @@
+import os
+import asyncio
+import heapq
+import itertools
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, Dict, List, Tuple
+
+# Lanes are served in ascending order; within a lane, first come first served
+LANE_HIGH = 0
+LANE_NORMAL = 1
+LANE_BULK = 2
+
+class AdmissionRejected(Exception):
+    """Raised when a request can't be admitted: 429 if the queue is full, 503 if it waited too long."""
+
+    def __init__(self, status_code: int, reason: str, retry_after: int):
+        super().__init__(reason)
+        self.status_code = status_code
+        self.reason = reason
+        self.retry_after = retry_after
+
+class AdmissionController:
+    """Bounded in-flight work and wait queue per endpoint class, under one shared in-flight limit.
+
+    Waiters are admitted by (lane, arrival order), so LANE_HIGH requests overtake anything queued.
+    LANE_HIGH requests are also never turned away for a full queue, only for waiting too long."""
+
+    def __init__(self, max_in_flight: int, classes: Dict[str, Tuple[int, int]], queue_timeout: float, retry_after: int):
+        self.max_in_flight = max_in_flight
+        self.classes = classes  # class -> (max_in_flight, max_queue)
+        self.queue_timeout = queue_timeout
+        self.retry_after = retry_after
+        self.in_flight = 0
+        self.class_in_flight = {name: 0 for name in classes}
+        self.class_queued = {name: 0 for name in classes}
+        self._waiters: List[Tuple[int, int, str, asyncio.Future]] = []
+        self._seq = itertools.count()
+
+    def _can_run(self, cls: str) -> bool:
+        return self.in_flight < self.max_in_flight and self.class_in_flight[cls] < self.classes[cls][0]
+
+    def _start(self, cls: str) -> None:
+        self.in_flight += 1
+        self.class_in_flight[cls] += 1
+
+    def _wake(self) -> None:
+        # Admit waiters in priority order; skip ones whose class is at its own limit
+        blocked = []
+        while self._waiters and self.in_flight < self.max_in_flight:
+            entry = heapq.heappop(self._waiters)
+            _, _, cls, fut = entry
+            if not self._can_run(cls):
+                blocked.append(entry)
+                continue
+            self.class_queued[cls] -= 1
+            self._start(cls)
+            fut.set_result(None)
+        for entry in blocked:
+            heapq.heappush(self._waiters, entry)
+
+    def _release(self, cls: str) -> None:
+        self.in_flight -= 1
+        self.class_in_flight[cls] -= 1
+        self._wake()
+
+    def _abandon(self, entry: Tuple[int, int, str, asyncio.Future]) -> None:
+        entry[3].cancel()
+        self._waiters.remove(entry)
+        heapq.heapify(self._waiters)
+        self.class_queued[entry[2]] -= 1
+
+    @asynccontextmanager
+    async def admit(self, cls: str, lane: int = LANE_NORMAL) -> AsyncIterator[None]:
+        if lane != LANE_HIGH and self.class_queued[cls] >= self.classes[cls][1]:
+            raise AdmissionRejected(429, f"Too many queued {cls} requests", self.retry_after)
+        fut = asyncio.get_running_loop().create_future()
+        entry = (lane, next(self._seq), cls, fut)
+        heapq.heappush(self._waiters, entry)
+        self.class_queued[cls] += 1
+        self._wake()
+        if not fut.done():
+            try:
+                await asyncio.wait_for(asyncio.shield(fut), timeout=self.queue_timeout)
+            except asyncio.TimeoutError:
+                if not fut.done():
+                    self._abandon(entry)
+                    raise AdmissionRejected(503, f"Timed out waiting for {cls} capacity", self.retry_after)
+            except asyncio.CancelledError:
+                # Client went away while queued; hand the slot on if we had already been admitted
+                if fut.done():
+                    self._release(cls)
+                else:
+                    self._abandon(entry)
+                raise
+        try:
+            yield
+        finally:
+            self._release(cls)
+
+    def snapshot(self) -> Dict[str, Dict[str, int]]:
+        return {
+            cls: {"in_flight": self.class_in_flight[cls], "queued": self.class_queued[cls]}
+            for cls in self.classes
+        }
+
+llm_admission = AdmissionController(
+    max_in_flight=int(os.getenv("ADMISSION_MAX_IN_FLIGHT", "8")),
+    classes={
+        "plan": (int(os.getenv("ADMISSION_PLAN_MAX_IN_FLIGHT", "4")), int(os.getenv("ADMISSION_PLAN_MAX_QUEUE", "8"))),
+        "approve": (int(os.getenv("ADMISSION_APPROVE_MAX_IN_FLIGHT", "8")), int(os.getenv("ADMISSION_APPROVE_MAX_QUEUE", "16"))),
+    },
+    queue_timeout=float(os.getenv("ADMISSION_QUEUE_TIMEOUT", "10")),
+    retry_after=int(os.getenv("ADMISSION_RETRY_AFTER", "5")),
+)
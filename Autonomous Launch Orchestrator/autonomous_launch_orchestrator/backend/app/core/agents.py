@@ -1,13 +1,39 @@
 from langchain_google_genai import ChatGoogleGenerativeAI
 from langchain.prompts import ChatPromptTemplate
 from langchain.schema import HumanMessage
+import os
 import json
 import uuid
 from datetime import datetime, timedelta
+from .tracing import span
+from .deadline import LLM_HEDGE_ENABLED, LatencyTracker, budget, call_with_deadline
+
+LLM_MODEL = "gemini-2.5-flash"
+# Share of the request's remaining time a role agent's LLM call may use; the rest is left for the
+# n8n webhook that follows it. Plan creation has no webhook, so the planner gets the full budget
+LLM_BUDGET_FRACTION = float(os.getenv("LLM_BUDGET_FRACTION", "0.7"))
+
+def _invoke_with_timeout(llm, prompt: str, timeout=None):
+    if timeout is None:
+        return llm.invoke(prompt)
+    # Per-request timeout on the Gemini call itself, so a call past its budget is really stopped;
+    # a single attempt, since client-side retries would run past the deadline anyway
+    return llm.invoke(prompt, timeout=timeout, max_retries=1)
+
+def _invoke_llm(llm, prompt: str, tracker: LatencyTracker, fraction: float = 1.0):
+    """llm.invoke bounded by fraction of the time left before the request deadline, hedged when LLM_HEDGE_ENABLED."""
+    return call_with_deadline(
+        _invoke_with_timeout, llm, prompt,
+        timeout=budget(fraction),
+        tracker=tracker,
+        hedge=LLM_HEDGE_ENABLED,
+    )
 
 class PlannerAgent:
+    latency = LatencyTracker()
+
     def __init__(self):
-        self.llm = ChatGoogleGenerativeAI(model="gemini-2.5-flash", temperature=0)        
+        self.llm = ChatGoogleGenerativeAI(model=LLM_MODEL, temperature=0)        
     def create_launch_plan(self, goal: str) -> list:
         """Create a structured launch plan from a high-level goal"""
         prompt = ChatPromptTemplate.from_template("""
@@ -35,7 +61,8 @@ class PlannerAgent:
         Return only the JSON array, no additional text.
         """)
         
-        response = self.llm.invoke(prompt.format(goal=goal))
+        with span("llm.planner", model=LLM_MODEL):
+            response = _invoke_llm(self.llm, prompt.format(goal=goal), PlannerAgent.latency, 1.0)
         try:
             tasks = json.loads(response.content)
             return tasks
@@ -71,9 +98,11 @@ class PlannerAgent:
         ]
 
 class RoleAgent:
+    latency = LatencyTracker()
+
     def __init__(self, role: str):
         self.role = role
-        self.llm = ChatGoogleGenerativeAI(model="gemini-2.5-flash", temperature=0.7)        
+        self.llm = ChatGoogleGenerativeAI(model=LLM_MODEL, temperature=0.7)        
     def generate_content(self, task_description: str) -> str:
         """Generate role-specific content for a task"""
         role_prompts = {
@@ -104,6 +133,7 @@ class RoleAgent:
         }
         
         prompt = role_prompts.get(self.role, role_prompts["marketing"])
-        response = self.llm.invoke(prompt.format(task=task_description))
+        with span("llm.role_agent", model=LLM_MODEL, role=self.role):
+            response = _invoke_llm(self.llm, prompt.format(task=task_description), RoleAgent.latency, LLM_BUDGET_FRACTION)
         return response.content
 
@@ -0,0 +1,146 @@
+import os
+import time
+import queue
+import threading
+from collections import deque
+from contextlib import contextmanager
+from contextvars import ContextVar, copy_context
+from typing import Any, Callable, Iterator, Optional
+
+# End-to-end budget for one API request
+REQUEST_DEADLINE_SECONDS = float(os.getenv("REQUEST_DEADLINE_SECONDS", "60"))
+# Hedge slow LLM calls with a second request once the first exceeds the observed p95
+LLM_HEDGE_ENABLED = os.getenv("LLM_HEDGE_ENABLED", "false").lower() in ("1", "true", "yes")
+LLM_HEDGE_MIN_SAMPLES = int(os.getenv("LLM_HEDGE_MIN_SAMPLES", "20"))
+LLM_HEDGE_MIN_DELAY = float(os.getenv("LLM_HEDGE_MIN_DELAY", "1.0"))
+
+_deadline: ContextVar[Optional[float]] = ContextVar("request_deadline", default=None)
+# A call failing this close to its deadline is treated as having run out of time
+_CLOCK_SLACK = 0.05
+
+class DeadlineExceeded(TimeoutError):
+    pass
+
+@contextmanager
+def request_deadline(seconds: float = REQUEST_DEADLINE_SECONDS) -> Iterator[float]:
+    """Set the absolute deadline (time.monotonic()) for work done in this context."""
+    deadline = time.monotonic() + seconds
+    token = _deadline.set(deadline)
+    try:
+        yield deadline
+    finally:
+        _deadline.reset(token)
+
+def remaining() -> Optional[float]:
+    """Seconds left before the current deadline, or None when no deadline is set."""
+    deadline = _deadline.get()
+    return None if deadline is None else max(0.0, deadline - time.monotonic())
+
+def budget(fraction: float = 1.0, cap: Optional[float] = None) -> Optional[float]:
+    """Share of the remaining time for the next call, optionally capped. Raises if already expired."""
+    left = remaining()
+    if left is None:
+        return cap
+    if left <= 0:
+        raise DeadlineExceeded("request deadline exceeded")
+    share = left * fraction
+    return share if cap is None else min(share, cap)
+
+class LatencyTracker:
+    """Rolling window of call latencies used to pick the hedge delay."""
+
+    def __init__(self, size: int = 200):
+        self._samples: deque = deque(maxlen=size)
+        self._lock = threading.Lock()
+
+    def observe(self, seconds: float) -> None:
+        with self._lock:
+            self._samples.append(seconds)
+
+    def p95(self) -> Optional[float]:
+        with self._lock:
+            if len(self._samples) < LLM_HEDGE_MIN_SAMPLES:
+                return None
+            ordered = sorted(self._samples)
+        return ordered[int(0.95 * (len(ordered) - 1))]
+
+def _left(end: Optional[float]) -> Optional[float]:
+    return None if end is None else max(0.0, end - time.monotonic())
+
+def _expired(end: Optional[float]) -> bool:
+    # Client timeouts run on their own clock and may fire a hair early
+    return end is not None and time.monotonic() >= end - _CLOCK_SLACK
+
+def _start_attempt(fn: Callable[..., Any], args: tuple, end: Optional[float], results: "queue.Queue") -> None:
+    # Each attempt gets its own thread (no shared pool to queue behind) running in a copy of the
+    # caller's context (trace spans, deadline); fn's own timeout makes it stop by the deadline
+    ctx = copy_context()
+    timeout = _left(end)
+
+    def run() -> None:
+        try:
+            results.put((True, ctx.run(fn, *args, timeout=timeout)))
+        except BaseException as e:
+            results.put((False, e))
+
+    threading.Thread(target=run, name="deadline-attempt", daemon=True).start()
+
+def call_with_deadline(
+    fn: Callable[..., Any],
+    *args: Any,
+    timeout: Optional[float] = None,
+    tracker: Optional[LatencyTracker] = None,
+    hedge: bool = False,
+) -> Any:
+    """Run fn(*args, timeout=seconds_left) and raise DeadlineExceeded once timeout seconds have passed.
+
+    fn must honour its timeout argument (e.g. the LLM client's request timeout) so an expired call
+    actually stops rather than running on in the background. With hedge=True and enough latency
+    history, a second attempt is started after the p95 delay and whichever succeeds first wins."""
+    start = time.monotonic()
+    end = None if timeout is None else start + timeout
+
+    hedge_delay = tracker.p95() if (hedge and tracker is not None) else None
+    if hedge_delay is not None:
+        hedge_delay = max(hedge_delay, LLM_HEDGE_MIN_DELAY)
+        if end is not None and start + hedge_delay >= end:
+            hedge_delay = None
+
+    if hedge_delay is None:
+        # Nothing to race: call inline, the timeout is enforced by fn itself
+        try:
+            result = fn(*args, timeout=timeout)
+        except Exception as e:
+            if _expired(end):
+                raise DeadlineExceeded(f"call exceeded its {timeout:.1f}s budget") from e
+            raise
+        if tracker is not None:
+            tracker.observe(time.monotonic() - start)
+        return result
+
+    results: queue.Queue = queue.Queue()
+    _start_attempt(fn, args, end, results)
+    attempts = 1
+    errors = []
+    while len(errors) < attempts:
+        wait_for = _left(end)
+        if attempts == 1:
+            wait_for = hedge_delay - (time.monotonic() - start)
+        try:
+            ok, value = results.get(timeout=max(0.0, wait_for) if wait_for is not None else None)
+        except queue.Empty:
+            if attempts == 1:
+                _start_attempt(fn, args, end, results)
+                attempts = 2
+                continue
+            break
+        if ok:
+            if tracker is not None:
+                tracker.observe(time.monotonic() - start)
+            return value
+        errors.append(value)
+        if attempts == 1:
+            break
+    if errors and not _expired(end):
+        raise errors[0]
+    raise DeadlineExceeded(f"call exceeded its {timeout:.1f}s budget") from (errors[0] if errors else None)
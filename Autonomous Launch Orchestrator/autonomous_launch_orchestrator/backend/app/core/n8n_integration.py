@@ -1,6 +1,11 @@
 import os
 import requests
 from typing import Dict, Any
+from .tracing import span, trace_context, traceparent_header
+from .deadline import DeadlineExceeded, budget
+
+# Upper bound for one webhook call; tighter when the request deadline leaves less
+WEBHOOK_TIMEOUT_SECONDS = 30
 
 class N8NIntegration:
     def __init__(self, n8n_base_url: str = "http://localhost:5678"):
@@ -22,7 +27,24 @@ class N8NIntegration:
         """Trigger an n8n workflow via webhook"""
         webhook_url = self._resolve_webhook_url(workflow_name_or_url)
         try:
-            resp = requests.post(webhook_url, json=data, timeout=30)
+            timeout = budget(cap=WEBHOOK_TIMEOUT_SECONDS)
+        except DeadlineExceeded as e:
+            return {"status": "error", "error": str(e), "status_code": None, "url": webhook_url}
+        with span("n8n.trigger_workflow", workflow=workflow_name_or_url, url=webhook_url) as s:
+            result = self._post(webhook_url, data, timeout)
+            if s is not None:
+                s.set(status_code=result.get("status_code"))
+                if result["status"] != "success":
+                    s.error = result.get("error") or f"HTTP {result.get('status_code')}"
+            return result
+
+    def _post(self, webhook_url: str, data: Dict[str, Any], timeout: float) -> Dict[str, Any]:
+        # Propagate the trace so n8n executions can be joined with our spans
+        ctx = trace_context()
+        if ctx:
+            data = {**data, "trace": ctx}
+        try:
+            resp = requests.post(webhook_url, json=data, headers=traceparent_header(), timeout=timeout)
             ok = 200 <= resp.status_code < 300
             return {
                 "status": "success" if ok else "error",
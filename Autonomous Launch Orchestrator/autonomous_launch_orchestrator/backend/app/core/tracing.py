@@ -0,0 +1,165 @@
+import os
+import json
+import time
+import uuid
+import random
+import tempfile
+import logging
+import threading
+from contextlib import contextmanager
+from contextvars import ContextVar
+from logging.handlers import RotatingFileHandler
+from typing import Any, Dict, Iterator, List, Optional
+
+TRACING_ENABLED = os.getenv("TRACING_ENABLED", "true").lower() not in ("0", "false", "no")
+# Fraction of traces kept unconditionally; slow or failed traces are always kept
+TRACE_SAMPLE_RATE = float(os.getenv("TRACE_SAMPLE_RATE", "0.1"))
+TRACE_SLOW_MS = float(os.getenv("TRACE_SLOW_MS", "2000"))
+# Outside the source tree by default so local runs don't leave span files in the checkout
+TRACE_FILE = os.getenv("TRACE_FILE", os.path.join(tempfile.gettempdir(), "launch-orchestrator", "traces", "spans.jsonl"))
+TRACE_FILE_MAX_BYTES = int(os.getenv("TRACE_FILE_MAX_BYTES", str(10 * 1024 * 1024)))
+TRACE_FILE_BACKUPS = int(os.getenv("TRACE_FILE_BACKUPS", "5"))
+
+_current_span: ContextVar[Optional["Span"]] = ContextVar("current_span", default=None)
+_exporter: Optional[logging.Logger] = None
+_exporter_lock = threading.Lock()
+
+def _new_id(nbytes: int) -> str:
+    return uuid.uuid4().hex[: nbytes * 2]
+
+class _Trace:
+    """Spans of one request, buffered until the root ends so the keep/drop decision can use its latency."""
+
+    def __init__(self, sampled: bool):
+        self.trace_id = _new_id(16)
+        self.sampled = sampled
+        self.spans: List[Dict[str, Any]] = []
+        self.lock = threading.Lock()
+
+class Span:
+    def __init__(self, name: str, trace: _Trace, parent_id: Optional[str], attrs: Dict[str, Any]):
+        self.name = name
+        self.trace = trace
+        self.span_id = _new_id(8)
+        self.parent_id = parent_id
+        self.attrs = dict(attrs)
+        self.error: Optional[str] = None
+        self.start_time = time.time()
+        self._start = time.perf_counter()
+        self.duration_ms: Optional[float] = None
+
+    def set(self, **attrs: Any) -> None:
+        self.attrs.update(attrs)
+
+    def end(self) -> None:
+        self.duration_ms = (time.perf_counter() - self._start) * 1000
+        with self.trace.lock:
+            self.trace.spans.append({
+                "trace_id": self.trace.trace_id,
+                "span_id": self.span_id,
+                "parent_id": self.parent_id,
+                "name": self.name,
+                "start": self.start_time,
+                "duration_ms": round(self.duration_ms, 3),
+                "status": "error" if self.error else "ok",
+                "error": self.error,
+                "attrs": self.attrs,
+            })
+
+def _get_exporter() -> logging.Logger:
+    global _exporter
+    with _exporter_lock:
+        if _exporter is None:
+            os.makedirs(os.path.dirname(TRACE_FILE), exist_ok=True)
+            handler = RotatingFileHandler(TRACE_FILE, maxBytes=TRACE_FILE_MAX_BYTES, backupCount=TRACE_FILE_BACKUPS)
+            handler.setFormatter(logging.Formatter("%(message)s"))
+            logger = logging.getLogger("orchestrator.traces")
+            logger.setLevel(logging.INFO)
+            logger.propagate = False
+            logger.addHandler(handler)
+            _exporter = logger
+    return _exporter
+
+def _export(trace: _Trace, root: Span) -> None:
+    slow = root.duration_ms is not None and root.duration_ms >= TRACE_SLOW_MS
+    failed = any(s["status"] == "error" for s in trace.spans)
+    if not (trace.sampled or slow or failed):
+        return
+    exporter = _get_exporter()
+    for record in trace.spans:
+        exporter.info(json.dumps(record, default=str))
+
+@contextmanager
+def start_trace(name: str, **attrs: Any) -> Iterator[Optional[Span]]:
+    """Open the root span of a request; spans created inside it (any thread that copied the context) become children."""
+    if not TRACING_ENABLED:
+        yield None
+        return
+    root = Span(name, _Trace(sampled=random.random() < TRACE_SAMPLE_RATE), None, attrs)
+    token = _current_span.set(root)
+    try:
+        yield root
+    except Exception as e:
+        root.error = str(e)
+        raise
+    finally:
+        _current_span.reset(token)
+        root.end()
+        _export(root.trace, root)
+
+@contextmanager
+def span(name: str, **attrs: Any) -> Iterator[Optional[Span]]:
+    """Child span of the current one; a no-op outside a traced request."""
+    parent = _current_span.get()
+    if parent is None:
+        yield None
+        return
+    child = Span(name, parent.trace, parent.span_id, attrs)
+    token = _current_span.set(child)
+    try:
+        yield child
+    except Exception as e:
+        child.error = str(e)
+        raise
+    finally:
+        _current_span.reset(token)
+        child.end()
+
+def trace_context() -> Dict[str, str]:
+    """Ids of the current span, for propagation to downstream systems (empty outside a trace)."""
+    current = _current_span.get()
+    if current is None:
+        return {}
+    return {"trace_id": current.trace.trace_id, "span_id": current.span_id}
+
+def traceparent_header() -> Dict[str, str]:
+    """W3C traceparent header for the current span (empty outside a trace)."""
+    ctx = trace_context()
+    if not ctx:
+        return {}
+    return {"traceparent": f"00-{ctx['trace_id']}-{ctx['span_id']}-01"}
+
+def instrument_engine(engine) -> None:
+    """Record a span per SQL statement executed inside a traced request."""
+    from sqlalchemy import event
+
+    @event.listens_for(engine, "before_cursor_execute")
+    def _before(conn, cursor, statement, parameters, context, executemany):
+        parent = _current_span.get()
+        if parent is not None:
+            context._trace_span = Span("sql", parent.trace, parent.span_id, {"db.statement": statement[:500]})
+
+    @event.listens_for(engine, "after_cursor_execute")
+    def _after(conn, cursor, statement, parameters, context, executemany):
+        sql_span = getattr(context, "_trace_span", None)
+        if sql_span is not None:
+            sql_span.set(rowcount=cursor.rowcount)
+            sql_span.end()
+
+    @event.listens_for(engine, "handle_error")
+    def _error(exception_context):
+        context = exception_context.execution_context
+        sql_span = getattr(context, "_trace_span", None) if context is not None else None
+        if sql_span is not None:
+            sql_span.error = str(exception_context.original_exception)
+            sql_span.end()
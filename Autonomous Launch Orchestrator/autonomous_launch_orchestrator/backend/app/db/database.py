@@ -1,8 +1,11 @@
 import os
 from dotenv import load_dotenv
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, inspect, text
 from sqlalchemy.orm import sessionmaker
 from .models import Base
+from .search import install_search_indexes
+from .stats import ensure_stats
+from ..core.tracing import instrument_engine
 
 # Load .env and prefer its values
 load_dotenv(override=True)
@@ -20,6 +23,7 @@ if DATABASE_URL.startswith("sqlite"):
     engine_kwargs["connect_args"] = {"check_same_thread": False}
 
 engine = create_engine(DATABASE_URL, **engine_kwargs)
+instrument_engine(engine)
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
 def get_db():
@@ -29,6 +33,21 @@ def get_db():
     finally:
         db.close()
 
+def _add_missing_columns():
+    """create_all() never alters existing tables; add columns introduced after a table was first created."""
+    existing = {c["name"] for c in inspect(engine).get_columns("tasks")}
+    if "plan_id" not in existing:
+        with engine.begin() as conn:
+            conn.execute(text("ALTER TABLE tasks ADD COLUMN plan_id INTEGER REFERENCES plans(id)"))
+            conn.execute(text("CREATE INDEX IF NOT EXISTS ix_tasks_plan_id ON tasks (plan_id)"))
+
 def create_tables():
     Base.metadata.create_all(bind=engine)
+    _add_missing_columns()
+    install_search_indexes(engine)
+    db = SessionLocal()
+    try:
+        ensure_stats(db)
+    finally:
+        db.close()
 
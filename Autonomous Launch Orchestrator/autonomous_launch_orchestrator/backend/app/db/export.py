@@ -0,0 +1,61 @@
+import csv
+import io
+import json
+import zlib
+from typing import Any, Iterator, List
+from sqlalchemy import select
+from .database import SessionLocal
+from .models import Task, ExecutionLog
+
+EXPORT_MODELS = {
+    "tasks": Task,
+    "logs": ExecutionLog,
+}
+
+# Rows fetched from the server-side cursor (and emitted) per chunk
+CHUNK_SIZE = 1000
+
+def _value(value: Any) -> Any:
+    return value.isoformat() if hasattr(value, "isoformat") else value
+
+def _iter_chunks(dataset: str) -> Iterator[List[Any]]:
+    """Yield lists of up to CHUNK_SIZE rows, ordered by id, using a server-side cursor where supported.
+    Opens its own session because the response body is produced after the request handler returns."""
+    model = EXPORT_MODELS[dataset]
+    db = SessionLocal()
+    try:
+        stmt = select(*model.__table__.c).order_by(model.id)
+        result = db.execute(stmt.execution_options(stream_results=True, yield_per=CHUNK_SIZE))
+        for partition in result.partitions(CHUNK_SIZE):
+            yield partition
+    finally:
+        db.close()
+
+def iter_ndjson(dataset: str) -> Iterator[bytes]:
+    columns = [c.name for c in EXPORT_MODELS[dataset].__table__.c]
+    for rows in _iter_chunks(dataset):
+        yield "".join(
+            json.dumps({name: _value(v) for name, v in zip(columns, row)}) + "\n" for row in rows
+        ).encode()
+
+def iter_csv(dataset: str) -> Iterator[bytes]:
+    columns = [c.name for c in EXPORT_MODELS[dataset].__table__.c]
+    buf = io.StringIO()
+    writer = csv.writer(buf)
+    writer.writerow(columns)
+    for rows in _iter_chunks(dataset):
+        writer.writerows([_value(v) for v in row] for row in rows)
+        yield buf.getvalue().encode()
+        buf.seek(0)
+        buf.truncate()
+    if buf.tell():
+        # Empty table: still emit the header
+        yield buf.getvalue().encode()
+
+def gzip_stream(chunks: Iterator[bytes]) -> Iterator[bytes]:
+    compressor = zlib.compressobj(wbits=31)  # 31 = gzip container
+    for chunk in chunks:
+        data = compressor.compress(chunk)
+        if data:
+            yield data
+    yield compressor.flush()
@@ -0,0 +1,25 @@
+import json
+from typing import Any, Dict, Optional
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+from .models import IdempotencyRecord
+
+class IdempotencyKeyReused(ValueError):
+    """The key was already used for a different task."""
+
+def get_stored_response(db: Session, key: str, task_id: str) -> Optional[Dict[str, Any]]:
+    """Stored response for key, or None. Raises IdempotencyKeyReused if key belongs to another task."""
+    record = db.get(IdempotencyRecord, key)
+    if record is None:
+        return None
+    if record.task_id != task_id:
+        raise IdempotencyKeyReused(f"Idempotency-Key was already used for task {record.task_id}")
+    return json.loads(record.response)
+
+def store_response(db: Session, key: str, task_id: str, response: Dict[str, Any]) -> None:
+    """Persist the response for key; a concurrent writer with the same key keeps its own record."""
+    db.add(IdempotencyRecord(key=key, task_id=task_id, response=json.dumps(response, default=str)))
+    try:
+        db.commit()
+    except IntegrityError:
+        db.rollback()
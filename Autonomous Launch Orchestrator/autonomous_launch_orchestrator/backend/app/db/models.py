@@ -1,14 +1,30 @@
-from sqlalchemy import Column, Integer, String, DateTime, Text
+from sqlalchemy import Column, Integer, String, DateTime, Text, Float, ForeignKey
 from sqlalchemy.orm import declarative_base
 from sqlalchemy.sql import func
 
 Base = declarative_base()
 
+class Plan(Base):
+    """One launch; task progress counters are maintained as its tasks change status."""
+    __tablename__ = "plans"
+
+    id = Column(Integer, primary_key=True, index=True)
+    goal = Column(Text, nullable=False)
+    total_tasks = Column(Integer, nullable=False, default=0)
+    pending_tasks = Column(Integer, nullable=False, default=0)
+    approved_tasks = Column(Integer, nullable=False, default=0)
+    completed_tasks = Column(Integer, nullable=False, default=0)
+    failed_tasks = Column(Integer, nullable=False, default=0)
+    rejected_tasks = Column(Integer, nullable=False, default=0)
+    created_at = Column(DateTime, server_default=func.now(), nullable=False)
+    updated_at = Column(DateTime, server_default=func.now(), onupdate=func.now(), nullable=False)
+
 class Task(Base):
     __tablename__ = "tasks"
 
     id = Column(Integer, primary_key=True, index=True)
     task_id = Column(String(64), unique=True, index=True, nullable=False)
+    plan_id = Column(Integer, ForeignKey("plans.id"), index=True, nullable=True)
     role = Column(String(64), nullable=False)
     description = Column(Text, nullable=False)
     deadline = Column(DateTime, nullable=True)
@@ -27,3 +43,34 @@ class ExecutionLog(Base):
     execution_details = Column(Text, nullable=True)
     executed_at = Column(DateTime, server_default=func.now(), nullable=False)
 
+
+# Columns returned by the task/log list endpoints (selected as plain row tuples)
+TASK_LIST_COLUMNS = (Task.id, Task.task_id, Task.plan_id, Task.role, Task.description, Task.deadline, Task.priority, Task.status, Task.created_at)
+LOG_LIST_COLUMNS = (ExecutionLog.id, ExecutionLog.task_id, ExecutionLog.workflow_name, ExecutionLog.execution_status, ExecutionLog.execution_details, ExecutionLog.executed_at)
+
+class TaskStatusCount(Base):
+    """Running task count per (role, status), maintained alongside task writes."""
+    __tablename__ = "task_status_counts"
+
+    role = Column(String(64), primary_key=True)
+    status = Column(String(32), primary_key=True)
+    count = Column(Integer, nullable=False, default=0)
+
+class WorkflowStat(Base):
+    """Running execution totals per workflow, maintained alongside execution log writes."""
+    __tablename__ = "workflow_stats"
+
+    workflow_name = Column(String(128), primary_key=True)
+    executions = Column(Integer, nullable=False, default=0)
+    successes = Column(Integer, nullable=False, default=0)
+    latency_samples = Column(Integer, nullable=False, default=0)
+    latency_total_seconds = Column(Float, nullable=False, default=0.0)
+
+class IdempotencyRecord(Base):
+    """Stored result of a side-effecting request, replayed for repeats with the same Idempotency-Key."""
+    __tablename__ = "idempotency_records"
+
+    key = Column(String(128), primary_key=True)
+    task_id = Column(String(64), index=True, nullable=False)
+    response = Column(Text, nullable=False)
+    created_at = Column(DateTime, server_default=func.now(), nullable=False)
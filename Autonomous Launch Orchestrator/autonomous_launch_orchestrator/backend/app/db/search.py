@@ -0,0 +1,134 @@
+import re
+from typing import Any, Dict, List, Optional, Tuple
+from sqlalchemy import Float, text
+from sqlalchemy.engine import Engine
+from sqlalchemy.orm import Session
+from .models import Task, ExecutionLog
+
+# Indexed text column per searchable model: (model, text column)
+SEARCH_TARGETS = {
+    "tasks": (Task, "description"),
+    "logs": (ExecutionLog, "execution_details"),
+}
+
+def _install_postgres(conn) -> None:
+    for model, column in SEARCH_TARGETS.values():
+        table = model.__tablename__
+        conn.execute(text(
+            f"CREATE INDEX IF NOT EXISTS ix_{table}_{column}_fts "
+            f"ON {table} USING GIN (to_tsvector('english', coalesce({column}, '')))"
+        ))
+
+def _install_sqlite(conn) -> None:
+    for model, column in SEARCH_TARGETS.values():
+        table, pk, fts = model.__tablename__, "id", f"{model.__tablename__}_fts"
+        exists = conn.execute(
+            text("SELECT sql FROM sqlite_master WHERE type='table' AND name=:name"), {"name": fts}
+        ).first()
+        if exists and "porter" not in exists.sql:
+            # Created before stemming was enabled: recreate and reindex it
+            conn.execute(text(f"DROP TABLE {fts}"))
+            exists = None
+        # Porter stemming so "webhooks" matches "webhook", like Postgres' 'english' config
+        conn.execute(text(
+            f"CREATE VIRTUAL TABLE IF NOT EXISTS {fts} "
+            f"USING fts5({column}, content='{table}', content_rowid='{pk}', tokenize='porter unicode61')"
+        ))
+        # External-content FTS5 tables are kept in sync by triggers
+        conn.execute(text(
+            f"CREATE TRIGGER IF NOT EXISTS {fts}_ai AFTER INSERT ON {table} BEGIN "
+            f"INSERT INTO {fts}(rowid, {column}) VALUES (new.{pk}, new.{column}); END"
+        ))
+        conn.execute(text(
+            f"CREATE TRIGGER IF NOT EXISTS {fts}_ad AFTER DELETE ON {table} BEGIN "
+            f"INSERT INTO {fts}({fts}, rowid, {column}) VALUES ('delete', old.{pk}, old.{column}); END"
+        ))
+        conn.execute(text(
+            f"CREATE TRIGGER IF NOT EXISTS {fts}_au AFTER UPDATE OF {column} ON {table} BEGIN "
+            f"INSERT INTO {fts}({fts}, rowid, {column}) VALUES ('delete', old.{pk}, old.{column}); "
+            f"INSERT INTO {fts}(rowid, {column}) VALUES (new.{pk}, new.{column}); END"
+        ))
+        if not exists:
+            # Index rows written before the FTS table existed
+            conn.execute(text(f"INSERT INTO {fts}({fts}) VALUES ('rebuild')"))
+
+def install_search_indexes(engine: Engine) -> None:
+    """Create full-text indexes for the current dialect (GIN on Postgres, FTS5 on SQLite)."""
+    with engine.begin() as conn:
+        if engine.dialect.name == "postgresql":
+            _install_postgres(conn)
+        elif engine.dialect.name == "sqlite":
+            _install_sqlite(conn)
+
+def _fts5_query(q: str) -> str:
+    # Quote each term so user input can't inject FTS5 syntax; terms are ANDed
+    return " ".join(f'"{term}"' for term in re.findall(r"\w+", q))
+
+def _filters(scope: str, role: Optional[str], status: Optional[str]) -> Tuple[str, str, Dict[str, Any]]:
+    """Return (extra join, extra where, params) for the role/status filters of a scope."""
+    join, where, params = "", "", {}
+    if scope == "tasks":
+        if role:
+            where += " AND lower(t.role) = lower(:role)"
+            params["role"] = role
+        if status:
+            where += " AND t.status = :status"
+            params["status"] = status
+    else:
+        if role:
+            join = " JOIN tasks tk ON tk.task_id = t.task_id"
+            where += " AND lower(tk.role) = lower(:role)"
+            params["role"] = role
+        if status:
+            where += " AND t.execution_status = :status"
+            params["status"] = status
+    return join, where, params
+
+def search(
+    db: Session,
+    q: str,
+    scope: str = "tasks",
+    role: Optional[str] = None,
+    status: Optional[str] = None,
+    limit: int = 20,
+    offset: int = 0,
+) -> Tuple[int, List[Dict[str, Any]]]:
+    """Ranked full-text search over tasks or execution logs. Returns (total, rows)."""
+    model, column = SEARCH_TARGETS[scope]
+    table, pk = model.__tablename__, "id"
+    join, where, params = _filters(scope, role, status)
+    dialect = db.get_bind().dialect.name
+
+    if dialect == "postgresql":
+        vector = f"to_tsvector('english', coalesce(t.{column}, ''))"
+        source = f"{table} t{join}"
+        match = f"{vector} @@ plainto_tsquery('english', :q)"
+        rank = f"ts_rank({vector}, plainto_tsquery('english', :q))"
+        params["q"] = q
+    elif dialect == "sqlite":
+        fts_q = _fts5_query(q)
+        if not fts_q:
+            return 0, []
+        source = f"{table}_fts JOIN {table} t ON t.{pk} = {table}_fts.rowid{join}"
+        match = f"{table}_fts MATCH :q"
+        rank = f"-bm25({table}_fts)"
+        params["q"] = fts_q
+    else:
+        source = f"{table} t{join}"
+        match = f"lower(t.{column}) LIKE lower(:q)"
+        rank = "0"
+        params["q"] = f"%{q}%"
+
+    total = db.execute(
+        text(f"SELECT count(*) FROM {source} WHERE {match}{where}"), params
+    ).scalar() or 0
+    # Type the textual columns so DateTime values come back as datetimes on every dialect
+    stmt = text(
+        f"SELECT t.*, {rank} AS rank FROM {source} WHERE {match}{where} "
+        f"ORDER BY rank DESC, t.{pk} DESC LIMIT :limit OFFSET :offset"
+    ).columns(rank=Float, **{c.name: c.type for c in model.__table__.c})
+    rows = db.execute(
+        stmt,
+        {**params, "limit": limit, "offset": offset},
+    ).mappings().all()
+    return int(total), [dict(r) for r in rows]
@@ -0,0 +1,142 @@
+from typing import Any, Dict, Optional
+from sqlalchemy import case, func
+from sqlalchemy.orm import Session
+from .models import Plan, Task, ExecutionLog, TaskStatusCount, WorkflowStat
+
+# Per-plan progress counter for each task status
+PLAN_COUNTERS = {
+    "pending": Plan.pending_tasks,
+    "approved": Plan.approved_tasks,
+    "completed": Plan.completed_tasks,
+    "failed": Plan.failed_tasks,
+    "rejected": Plan.rejected_tasks,
+}
+
+def _increment(db: Session, model, keys: Dict[str, Any], increments: Dict[str, Any]) -> None:
+    """Add increments to the row identified by keys, creating it if missing, as one atomic upsert
+    (INSERT ... ON CONFLICT DO UPDATE) so concurrent first writers can't collide on the primary key."""
+    dialect = db.get_bind().dialect.name
+    if dialect in ("postgresql", "sqlite"):
+        if dialect == "postgresql":
+            from sqlalchemy.dialects.postgresql import insert
+        else:
+            from sqlalchemy.dialects.sqlite import insert
+        stmt = insert(model).values(**keys, **increments)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=list(keys),
+            set_={col: model.__table__.c[col] + stmt.excluded[col] for col in increments},
+        )
+        db.execute(stmt)
+        return
+    # Other dialects: update-then-insert (not safe against concurrent first inserts)
+    table = model.__table__
+    updated = (
+        db.query(model)
+        .filter(*(table.c[k] == v for k, v in keys.items()))
+        .update({table.c[col]: table.c[col] + v for col, v in increments.items()}, synchronize_session=False)
+    )
+    if not updated:
+        db.add(model(**keys, **increments))
+        db.flush()
+
+def _bump_status(db: Session, role: str, status: str, delta: int) -> None:
+    _increment(db, TaskStatusCount, {"role": role, "status": status}, {"count": delta})
+
+def _bump_plan(db: Session, plan_id: int, old_status: Optional[str], new_status: str, count: int = 1) -> None:
+    values = {}
+    if old_status is None:
+        values[Plan.total_tasks] = Plan.total_tasks + count
+    elif old_status in PLAN_COUNTERS:
+        values[PLAN_COUNTERS[old_status]] = PLAN_COUNTERS[old_status] - count
+    if new_status in PLAN_COUNTERS:
+        values[PLAN_COUNTERS[new_status]] = PLAN_COUNTERS[new_status] + count
+    if values:
+        db.query(Plan).filter(Plan.id == plan_id).update(values, synchronize_session=False)
+
+def record_task_transition(
+    db: Session, role: str, old_status: Optional[str], new_status: str, plan_id: Optional[int] = None
+) -> None:
+    """Move one task between status buckets (global and, if it belongs to one, its plan's);
+    old_status=None for newly created tasks. Runs inside the caller's transaction so counters
+    commit (or roll back) with the task."""
+    record_bulk_transition(db, {role: 1}, old_status, new_status, plan_id)
+
+def record_bulk_transition(
+    db: Session, counts_by_role: Dict[str, int], old_status: Optional[str], new_status: str, plan_id: Optional[int] = None
+) -> None:
+    """Move several tasks of one plan between the same two statuses: one upsert per role and
+    bucket plus a single plan update, however many tasks moved."""
+    if old_status == new_status:
+        return
+    for role, count in counts_by_role.items():
+        if not count:
+            continue
+        if old_status is not None:
+            _bump_status(db, role, old_status, -count)
+        _bump_status(db, role, new_status, count)
+    total = sum(counts_by_role.values())
+    if plan_id is not None and total:
+        _bump_plan(db, plan_id, old_status, new_status, total)
+
+def record_execution(db: Session, workflow_name: str, success: bool, latency_seconds: Optional[float] = None) -> None:
+    """Add one execution (and its approval-to-completion latency) to the workflow totals."""
+    _increment(db, WorkflowStat, {"workflow_name": workflow_name}, {
+        "executions": 1,
+        "successes": 1 if success else 0,
+        "latency_samples": 0 if latency_seconds is None else 1,
+        "latency_total_seconds": latency_seconds or 0.0,
+    })
+
+def rebuild_stats(db: Session) -> None:
+    """Recompute the summary tables from tasks/execution_logs (one-off backfill).
+    History has no completion timestamps, so latency starts accumulating from here."""
+    db.query(TaskStatusCount).delete()
+    db.query(WorkflowStat).delete()
+    for role, status, count in db.query(Task.role, Task.status, func.count()).group_by(Task.role, Task.status):
+        db.add(TaskStatusCount(role=role, status=status, count=count))
+    success = case((ExecutionLog.execution_status == "success", 1), else_=0)
+    rows = db.query(ExecutionLog.workflow_name, func.count(), func.sum(success)).group_by(ExecutionLog.workflow_name)
+    for workflow_name, executions, successes in rows:
+        db.add(WorkflowStat(
+            workflow_name=workflow_name,
+            executions=executions,
+            successes=int(successes or 0),
+            latency_samples=0,
+            latency_total_seconds=0.0,
+        ))
+    db.commit()
+
+def ensure_stats(db: Session) -> None:
+    """Backfill the summary tables if they are empty but history exists."""
+    if db.query(TaskStatusCount).first() is None and db.query(Task.id).first() is not None:
+        rebuild_stats(db)
+
+def get_stats(db: Session) -> Dict[str, Any]:
+    """Dashboard statistics read from the summary tables only (cost independent of history size)."""
+    by_status: Dict[str, int] = {}
+    by_role: Dict[str, int] = {}
+    by_role_status = []
+    for row in db.query(TaskStatusCount).filter(TaskStatusCount.count != 0):
+        by_status[row.status] = by_status.get(row.status, 0) + row.count
+        by_role[row.role] = by_role.get(row.role, 0) + row.count
+        by_role_status.append({"role": row.role, "status": row.status, "count": row.count})
+
+    workflows = [
+        {
+            "workflow_name": w.workflow_name,
+            "executions": w.executions,
+            "successes": w.successes,
+            "failures": w.executions - w.successes,
+            "success_rate": (w.successes / w.executions) if w.executions else None,
+            "avg_latency_seconds": (w.latency_total_seconds / w.latency_samples) if w.latency_samples else None,
+        }
+        for w in db.query(WorkflowStat).order_by(WorkflowStat.workflow_name)
+    ]
+
+    return {
+        "total_tasks": sum(by_status.values()),
+        "tasks_by_status": by_status,
+        "tasks_by_role": by_role,
+        "tasks_by_role_status": by_role_status,
+        "workflows": workflows,
+    }
@@ -4,12 +4,14 @@ from dotenv import load_dotenv
 DOTENV_PATH = os.path.abspath(os.path.join(os.path.dirname(__file__), "../../.env"))
 load_dotenv(DOTENV_PATH, override=True)
 
-from fastapi import FastAPI
+from fastapi import FastAPI, Request
 from fastapi.middleware.cors import CORSMiddleware
 from sqlalchemy.engine.url import make_url, URL
 import typing as _t
 from .db.database import create_tables
 from .api.endpoints import router as api_router
+from .core.tracing import start_trace
+from .core.deadline import request_deadline
 
 app = FastAPI(title="Autonomous Launch Orchestrator API")
 
@@ -21,6 +23,32 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+def _route_template(request: Request) -> str:
+    """Matched route template including any router prefix, e.g. /api/tasks/{task_id}/approve.
+    The route's own path may omit the include_router prefix, so take that from the real URL."""
+    route = request.scope.get("route")
+    template = getattr(route, "path", None)
+    if not template:
+        return request.url.path
+    segments = request.url.path.rstrip("/").split("/")
+    template_depth = len(template.rstrip("/").split("/")) - 1
+    prefix = "/".join(segments[: len(segments) - template_depth])
+    return prefix + template if not template.startswith(prefix + "/") else template
+
+@app.middleware("http")
+async def trace_requests(request: Request, call_next):
+    """Root span and end-to-end deadline per request; child spans cover LLM calls, n8n webhooks and SQL."""
+    with start_trace(f"{request.method} {request.url.path}", method=request.method, path=request.url.path) as root, request_deadline():
+        response = await call_next(request)
+        if root is not None:
+            root.name = f"{request.method} {_route_template(request)}"
+            root.set(status_code=response.status_code)
+            if response.status_code >= 500:
+                # HTTPExceptions become responses inside call_next; still keep the trace as failed
+                root.error = f"HTTP {response.status_code}"
+            response.headers["X-Trace-Id"] = root.trace.trace_id
+        return response
+
 def _mask_db_url(raw: str) -> _t.Dict[str, _t.Any]:
     try:
         u: URL = make_url(raw)
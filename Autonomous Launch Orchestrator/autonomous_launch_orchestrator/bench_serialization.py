@@ -0,0 +1,93 @@
+#!/usr/bin/env python3
+"""
+Benchmark list-endpoint serialization: ORM hydration + hand-built dicts + FastAPI's
+default encoder (old /api/tasks path) vs column tuples + fast JSON encoder (current path).
+"""
+
+import sys
+import os
+import json
+import time
+from datetime import datetime, timedelta
+
+sys.path.append(os.path.join(os.path.dirname(__file__), 'backend'))
+
+from fastapi.encoders import jsonable_encoder
+from sqlalchemy import create_engine, select
+from sqlalchemy.orm import sessionmaker
+
+from backend.app.db.models import Base, Task, TASK_LIST_COLUMNS
+from backend.app.api.fast_json import dumps, orjson, rows_to_dicts
+
+ROWS = 10_000
+REPEATS = 5
+
+def seed(db):
+    now = datetime.utcnow()
+    db.add_all(
+        Task(
+            task_id=f"TASK-BENCH-{i}",
+            role=("marketing", "developer", "legal", "sales")[i % 4],
+            description=f"Benchmark task {i} " + "lorem ipsum " * 8,
+            deadline=now + timedelta(days=i % 30),
+            priority=("high", "medium", "low")[i % 3],
+            status="pending",
+            created_at=now,
+            updated_at=now,
+        )
+        for i in range(ROWS)
+    )
+    db.commit()
+
+def old_path(db) -> bytes:
+    tasks = db.query(Task).all()
+    content = [
+        {
+            "id": task.id,
+            "task_id": task.task_id,
+            "plan_id": task.plan_id,
+            "role": task.role,
+            "description": task.description,
+            "deadline": task.deadline.isoformat() if task.deadline else None,
+            "priority": task.priority,
+            "status": task.status,
+            "created_at": task.created_at.isoformat() if task.created_at else None
+        }
+        for task in tasks
+    ]
+    # What FastAPI does with a plain return value before JSONResponse renders it
+    return json.dumps(jsonable_encoder(content), ensure_ascii=False, separators=(",", ":")).encode()
+
+def new_path(db) -> bytes:
+    rows = db.execute(select(*TASK_LIST_COLUMNS)).all()
+    return dumps(rows_to_dicts([c.key for c in TASK_LIST_COLUMNS], rows))
+
+def timeit(fn, Session) -> float:
+    best = float("inf")
+    for _ in range(REPEATS):
+        db = Session()
+        start = time.perf_counter()
+        fn(db)
+        best = min(best, time.perf_counter() - start)
+        db.close()
+    return best
+
+def main():
+    engine = create_engine("sqlite://")
+    Base.metadata.create_all(bind=engine)
+    Session = sessionmaker(bind=engine)
+    db = Session()
+    seed(db)
+    db.close()
+
+    assert json.loads(old_path(Session())) == json.loads(new_path(Session()))
+
+    old = timeit(old_path, Session)
+    new = timeit(new_path, Session)
+    print(f"📊 /api/tasks serialization, {ROWS} rows (best of {REPEATS}, encoder: {'orjson' if orjson else 'json'})")
+    print(f"  ORM + dicts + jsonable_encoder: {old * 1000:8.1f} ms")
+    print(f"  column tuples + fast encoder:   {new * 1000:8.1f} ms")
+    print(f"  speedup: {old / new:.1f}x")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,74 @@
+import os
+import threading
+import time
+
+# Keep test runs from writing span files; must be set before backend modules are imported
+os.environ["TRACING_ENABLED"] = "false"
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine
+
+import backend.app.api.endpoints as endpoints
+from backend.app.db import database
+from backend.app.main import app
+
+@pytest.fixture
+def test_engine(tmp_path, monkeypatch):
+    """Point the app at a fresh SQLite database for one test (never the configured DATABASE_URL)."""
+    engine = create_engine(f"sqlite:///{tmp_path / 'test.db'}", connect_args={"check_same_thread": False})
+    monkeypatch.setattr(database, "engine", engine)
+    database.SessionLocal.configure(bind=engine)
+    database.create_tables()
+    yield engine
+    database.SessionLocal.configure(bind=None)
+    engine.dispose()
+
+class Calls:
+    def __init__(self):
+        self.llm = 0
+        self.webhooks = []
+        self.lock = threading.Lock()
+
+class FakePlanner:
+    def create_launch_plan(self, goal):
+        return [
+            {"role": "marketing", "description": f"Announce {goal}", "priority": "high"},
+            {"role": "legal", "description": f"Review terms for {goal}", "priority": "low"},
+            {"role": "marketing", "description": f"Blog post about {goal}", "priority": "medium"},
+        ]
+
+@pytest.fixture
+def calls(monkeypatch):
+    calls = Calls()
+
+    class FakeRoleAgent:
+        def __init__(self, role):
+            self.role = role
+
+        def generate_content(self, description):
+            with calls.lock:
+                calls.llm += 1
+            time.sleep(0.2)  # long enough for concurrent approvals to overlap
+            return f"content for {description}"
+
+    def trigger_workflow(workflow, data):
+        with calls.lock:
+            calls.webhooks.append(data)
+        return {"status": "success", "status_code": 200}
+
+    monkeypatch.setattr(endpoints, "get_planner_agent", lambda: FakePlanner())
+    monkeypatch.setattr(endpoints, "RoleAgent", FakeRoleAgent)
+    monkeypatch.setattr(endpoints.get_n8n_integration(), "trigger_workflow", trigger_workflow)
+    return calls
+
+@pytest.fixture
+def client(test_engine, calls):
+    with TestClient(app) as client:
+        yield client
+
+@pytest.fixture
+def tasks(client):
+    response = client.post("/api/create-plan", params={"goal": "v2"})
+    assert response.status_code == 200
+    return [t["task_id"] for t in response.json()["tasks"]]
@@ -70,7 +70,19 @@ def task_management_page():
         st.rerun()
     
     try:
-        response = requests.get(f"{API_BASE_URL}/tasks")
+        # Default to the latest launch so the view doesn't grow with history
+        plans_response = requests.get(f"{API_BASE_URL}/plans")
+        plans = plans_response.json() if plans_response.status_code == 200 else []
+        plan_labels = {
+            f"#{p['id']} - {p['goal'][:60]} ({p['completed_tasks']}/{p['total_tasks']} done)": p['id']
+            for p in plans
+        }
+        plan_choice = st.selectbox("Launch Plan", list(plan_labels) + ["All plans"])
+
+        if plan_choice == "All plans":
+            response = requests.get(f"{API_BASE_URL}/tasks")
+        else:
+            response = requests.get(f"{API_BASE_URL}/plans/{plan_labels[plan_choice]}/tasks")
         if response.status_code == 200:
             tasks = response.json()
             
@@ -186,9 +198,15 @@ def execution_logs_page():
 def approve_task(task_id: str):
     """Approve a task"""
     try:
-        response = requests.post(f"{API_BASE_URL}/tasks/{task_id}/approve")
+        # Same key per task: double-clicks and retries replay the first result instead of re-running it
+        response = requests.post(
+            f"{API_BASE_URL}/tasks/{task_id}/approve",
+            headers={"Idempotency-Key": f"approve-{task_id}"}
+        )
         if response.status_code == 200:
             st.success("✅ Task approved and executed!")
+        elif response.status_code == 409:
+            st.info("ℹ️ Task was already processed")
         else:
             st.error(f"Error approving task: {response.status_code}")
     except Exception as e:
@@ -200,6 +218,8 @@ def reject_task(task_id: str):
         response = requests.post(f"{API_BASE_URL}/tasks/{task_id}/reject")
         if response.status_code == 200:
             st.success("❌ Task rejected!")
+        elif response.status_code == 409:
+            st.info("ℹ️ Task was already processed")
         else:
             st.error(f"Error rejecting task: {response.status_code}")
     except Exception as e:
@@ -0,0 +1,141 @@
+#!/usr/bin/env python3
+"""
+Tests for the admission controller in front of the LLM-backed endpoints
+"""
+
+import asyncio
+
+import pytest
+
+from backend.app.core.admission import (
+    LANE_BULK, LANE_HIGH, LANE_NORMAL, AdmissionController, AdmissionRejected,
+)
+
+def make_controller(max_in_flight=1, plan=(1, 4), approve=(1, 4), queue_timeout=1.0):
+    return AdmissionController(
+        max_in_flight=max_in_flight,
+        classes={"plan": plan, "approve": approve},
+        queue_timeout=queue_timeout,
+        retry_after=7,
+    )
+
+async def hold(controller, cls, lane, started, release, order=None, name=None):
+    async with controller.admit(cls, lane):
+        if order is not None:
+            order.append(name)
+        started.set()
+        await release.wait()
+
+def test_waiters_are_admitted_by_lane():
+    async def run():
+        controller = make_controller()
+        release = asyncio.Event()
+        order = []
+        holder = asyncio.create_task(hold(controller, "plan", LANE_BULK, asyncio.Event(), release))
+        await asyncio.sleep(0)
+
+        waiters = []
+        for name, cls, lane in [("plan", "plan", LANE_BULK), ("normal", "approve", LANE_NORMAL), ("high", "approve", LANE_HIGH)]:
+            waiters.append(asyncio.create_task(hold(controller, cls, lane, asyncio.Event(), release, order, name)))
+            await asyncio.sleep(0)
+        assert controller.snapshot()["approve"]["queued"] == 2
+
+        release.set()
+        await asyncio.gather(holder, *waiters)
+        return order
+
+    assert asyncio.run(run()) == ["high", "normal", "plan"]
+
+def test_full_queue_is_rejected_with_429():
+    async def run():
+        controller = make_controller(plan=(1, 1))
+        release = asyncio.Event()
+        holder = asyncio.create_task(hold(controller, "plan", LANE_BULK, asyncio.Event(), release))
+        queued = asyncio.create_task(hold(controller, "plan", LANE_BULK, asyncio.Event(), release))
+        await asyncio.sleep(0)
+
+        with pytest.raises(AdmissionRejected) as exc:
+            async with controller.admit("plan", LANE_BULK):
+                pass
+        release.set()
+        await asyncio.gather(holder, queued)
+        return exc.value
+
+    rejected = asyncio.run(run())
+    assert rejected.status_code == 429
+    assert rejected.retry_after == 7
+
+def test_high_lane_is_not_rejected_for_a_full_queue():
+    async def run():
+        controller = make_controller(approve=(1, 1))
+        release = asyncio.Event()
+        tasks = [
+            asyncio.create_task(hold(controller, "approve", LANE_NORMAL, asyncio.Event(), release)),
+            asyncio.create_task(hold(controller, "approve", LANE_NORMAL, asyncio.Event(), release)),
+        ]
+        await asyncio.sleep(0)
+        high_started = asyncio.Event()
+        tasks.append(asyncio.create_task(hold(controller, "approve", LANE_HIGH, high_started, release)))
+        await asyncio.sleep(0)
+        assert controller.snapshot()["approve"]["queued"] == 2
+        release.set()
+        await asyncio.gather(*tasks)
+        return high_started.is_set()
+
+    assert asyncio.run(run())
+
+def test_queue_timeout_is_rejected_with_503_and_frees_the_queue_slot():
+    async def run():
+        controller = make_controller(queue_timeout=0.05)
+        release = asyncio.Event()
+        holder = asyncio.create_task(hold(controller, "plan", LANE_BULK, asyncio.Event(), release))
+        await asyncio.sleep(0)
+
+        with pytest.raises(AdmissionRejected) as exc:
+            async with controller.admit("plan", LANE_BULK):
+                pass
+        queued_after = controller.snapshot()["plan"]["queued"]
+        release.set()
+        await holder
+        return exc.value.status_code, queued_after
+
+    assert asyncio.run(run()) == (503, 0)
+
+def test_class_limit_does_not_block_other_classes():
+    async def run():
+        controller = make_controller(max_in_flight=2, plan=(1, 4), approve=(1, 4))
+        release = asyncio.Event()
+        holder = asyncio.create_task(hold(controller, "plan", LANE_BULK, asyncio.Event(), release))
+        queued_plan = asyncio.create_task(hold(controller, "plan", LANE_BULK, asyncio.Event(), release))
+        await asyncio.sleep(0)
+
+        approve_started = asyncio.Event()
+        approval = asyncio.create_task(hold(controller, "approve", LANE_NORMAL, approve_started, release))
+        await asyncio.wait_for(approve_started.wait(), timeout=1)
+        release.set()
+        await asyncio.gather(holder, queued_plan, approval)
+
+    asyncio.run(run())
+
+def test_cancelled_requests_release_their_slots():
+    async def run():
+        controller = make_controller()
+        release = asyncio.Event()
+        holder_started = asyncio.Event()
+        holder = asyncio.create_task(hold(controller, "plan", LANE_BULK, holder_started, release))
+        await holder_started.wait()
+        queued = asyncio.create_task(hold(controller, "plan", LANE_BULK, asyncio.Event(), release))
+        await asyncio.sleep(0)
+
+        # Client disconnects while queued, then while running
+        queued.cancel()
+        await asyncio.gather(queued, return_exceptions=True)
+        assert controller.snapshot()["plan"] == {"in_flight": 1, "queued": 0}
+        holder.cancel()
+        await asyncio.gather(holder, return_exceptions=True)
+        assert controller.in_flight == 0
+
+        async with controller.admit("plan", LANE_BULK):
+            return controller.snapshot()["plan"]
+
+    assert asyncio.run(run()) == {"in_flight": 1, "queued": 0}
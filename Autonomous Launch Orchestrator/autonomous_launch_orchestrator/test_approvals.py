@@ -0,0 +1,73 @@
+#!/usr/bin/env python3
+"""
+Tests for task approval: single execution under concurrency and Idempotency-Key replay
+"""
+
+import threading
+
+import backend.app.api.endpoints as endpoints
+
+def task_status(client, task_id):
+    return {t["task_id"]: t["status"] for t in client.get("/api/tasks").json()}[task_id]
+
+def test_concurrent_approvals_execute_once(client, calls, tasks):
+    results = []
+
+    def approve():
+        results.append(client.post(f"/api/tasks/{tasks[0]}/approve").status_code)
+
+    threads = [threading.Thread(target=approve) for _ in range(3)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    assert sorted(results) == [200, 409, 409]
+    assert calls.llm == 1
+    assert len(calls.webhooks) == 1
+    assert task_status(client, tasks[0]) == "completed"
+    assert len(client.get("/api/logs").json()) == 1
+
+def test_repeated_approval_without_key_is_rejected(client, calls, tasks):
+    assert client.post(f"/api/tasks/{tasks[0]}/approve").status_code == 200
+    assert client.post(f"/api/tasks/{tasks[0]}/approve").status_code == 409
+    assert client.post(f"/api/tasks/{tasks[0]}/reject").status_code == 409
+    assert calls.llm == 1
+
+def test_idempotency_key_replays_stored_result(client, calls, tasks):
+    headers = {"Idempotency-Key": "approve-once"}
+    first = client.post(f"/api/tasks/{tasks[0]}/approve", headers=headers)
+    second = client.post(f"/api/tasks/{tasks[0]}/approve", headers=headers)
+
+    assert first.status_code == second.status_code == 200
+    assert first.json() == second.json()
+    assert calls.llm == 1
+    assert len(calls.webhooks) == 1
+
+def test_idempotency_key_reused_for_another_task_is_rejected(client, calls, tasks):
+    headers = {"Idempotency-Key": "shared"}
+    assert client.post(f"/api/tasks/{tasks[0]}/approve", headers=headers).status_code == 200
+
+    response = client.post(f"/api/tasks/{tasks[1]}/approve", headers=headers)
+    assert response.status_code == 422
+    assert task_status(client, tasks[1]) == "pending"
+    assert calls.llm == 1
+
+def test_failed_finalize_still_finishes_task(client, calls, tasks, monkeypatch):
+    real_record_execution = endpoints.record_execution
+    failures = []
+
+    def flaky_record_execution(*args, **kwargs):
+        if not failures:
+            failures.append(True)
+            raise RuntimeError("db blip")
+        return real_record_execution(*args, **kwargs)
+
+    monkeypatch.setattr(endpoints, "record_execution", flaky_record_execution)
+    response = client.post(f"/api/tasks/{tasks[0]}/approve")
+
+    assert response.status_code == 200
+    assert response.json()["execution_result"]["status"] == "failed"
+    assert task_status(client, tasks[0]) == "failed"
+    logs = client.get("/api/logs").json()
+    assert [log["execution_status"] for log in logs] == ["failed"]
@@ -0,0 +1,103 @@
+#!/usr/bin/env python3
+"""
+Tests for request deadlines and hedged calls
+"""
+
+import threading
+import time
+
+import pytest
+
+import backend.app.core.deadline as deadline
+from backend.app.core.deadline import DeadlineExceeded, LatencyTracker, budget, call_with_deadline, request_deadline
+
+class FakeCall:
+    """Stands in for an LLM call: honours its timeout the way the client does, one latency per attempt."""
+
+    def __init__(self, *latencies):
+        self.latencies = list(latencies)
+        self.attempts = 0
+        self.lock = threading.Lock()
+
+    def __call__(self, prompt, timeout=None):
+        with self.lock:
+            attempt = self.attempts
+            self.attempts += 1
+        latency = self.latencies[min(attempt, len(self.latencies) - 1)]
+        if timeout is not None and latency > timeout:
+            time.sleep(timeout)
+            raise TimeoutError("client timeout")
+        time.sleep(latency)
+        return f"{prompt}:{attempt}"
+
+@pytest.fixture
+def hedge_tracker(monkeypatch):
+    monkeypatch.setattr(deadline, "LLM_HEDGE_MIN_SAMPLES", 3)
+    monkeypatch.setattr(deadline, "LLM_HEDGE_MIN_DELAY", 0.0)
+    tracker = LatencyTracker()
+    for _ in range(3):
+        tracker.observe(0.05)
+    return tracker
+
+def test_call_past_its_budget_raises_deadline_exceeded():
+    call = FakeCall(5.0)
+    start = time.monotonic()
+    with pytest.raises(DeadlineExceeded):
+        call_with_deadline(call, "p", timeout=0.2)
+    assert time.monotonic() - start < 1.0
+
+def test_expired_calls_do_not_delay_later_ones(hedge_tracker):
+    slow = FakeCall(5.0)
+    for _ in range(20):
+        with pytest.raises(DeadlineExceeded):
+            call_with_deadline(slow, "p", timeout=0.1, tracker=hedge_tracker, hedge=True)
+
+    start = time.monotonic()
+    assert call_with_deadline(FakeCall(0.0), "fast", timeout=1.0) == "fast:0"
+    assert time.monotonic() - start < 0.5
+
+def test_errors_before_the_deadline_are_not_deadline_exceeded():
+    def broken(prompt, timeout=None):
+        raise ValueError("bad prompt")
+
+    with pytest.raises(ValueError):
+        call_with_deadline(broken, "p", timeout=1.0)
+
+def test_no_hedge_without_latency_history(monkeypatch):
+    monkeypatch.setattr(deadline, "LLM_HEDGE_MIN_DELAY", 0.0)
+    call = FakeCall(0.2)
+    assert call_with_deadline(call, "p", timeout=1.0, tracker=LatencyTracker(), hedge=True) == "p:0"
+    assert call.attempts == 1
+
+def test_hedge_starts_after_p95_and_wins_when_faster(hedge_tracker):
+    call = FakeCall(1.0, 0.0)
+    start = time.monotonic()
+    assert call_with_deadline(call, "p", timeout=2.0, tracker=hedge_tracker, hedge=True) == "p:1"
+    assert call.attempts == 2
+    assert time.monotonic() - start < 0.5
+
+def test_first_result_wins(hedge_tracker):
+    call = FakeCall(0.2, 1.0)
+    assert call_with_deadline(call, "p", timeout=2.0, tracker=hedge_tracker, hedge=True) == "p:0"
+    assert call.attempts == 2
+
+def test_fast_call_is_not_hedged(hedge_tracker):
+    call = FakeCall(0.0)
+    assert call_with_deadline(call, "p", timeout=2.0, tracker=hedge_tracker, hedge=True) == "p:0"
+    time.sleep(0.1)
+    assert call.attempts == 1
+
+def test_hedged_call_past_its_budget_raises_deadline_exceeded(hedge_tracker):
+    call = FakeCall(5.0)
+    with pytest.raises(DeadlineExceeded):
+        call_with_deadline(call, "p", timeout=0.3, tracker=hedge_tracker, hedge=True)
+    assert call.attempts == 2
+
+def test_budget_shares_the_remaining_time():
+    assert budget(0.5, cap=3.0) == 3.0
+    with request_deadline(10.0):
+        assert 4.0 < budget(0.5) <= 5.0
+        assert budget(0.5, cap=1.0) == 1.0
+    with request_deadline(0.0):
+        with pytest.raises(DeadlineExceeded):
+            budget()
@@ -0,0 +1,91 @@
+#!/usr/bin/env python3
+"""
+Tests for the plan endpoints and their progress counters
+"""
+
+from sqlalchemy import event
+
+def create_plan(client, goal):
+    response = client.post("/api/create-plan", params={"goal": goal})
+    assert response.status_code == 200
+    return response.json()
+
+def plan_counters(client, plan_id):
+    plan = client.get(f"/api/plans/{plan_id}").json()
+    return {k: plan[k] for k in ("total_tasks", "pending_tasks", "approved_tasks", "completed_tasks", "failed_tasks", "rejected_tasks")}
+
+def test_plan_is_created_with_its_tasks(client):
+    plan = create_plan(client, "v2")
+
+    assert plan_counters(client, plan["plan_id"]) == {
+        "total_tasks": 3, "pending_tasks": 3, "approved_tasks": 0,
+        "completed_tasks": 0, "failed_tasks": 0, "rejected_tasks": 0,
+    }
+    tasks = client.get(f"/api/plans/{plan['plan_id']}/tasks").json()
+    assert [t["task_id"] for t in tasks] == [t["task_id"] for t in plan["tasks"]]
+    assert {t["plan_id"] for t in tasks} == {plan["plan_id"]}
+
+def test_plans_are_listed_newest_first(client):
+    first = create_plan(client, "v1")["plan_id"]
+    second = create_plan(client, "v2")["plan_id"]
+
+    assert [p["id"] for p in client.get("/api/plans").json()] == [second, first]
+    assert [p["id"] for p in client.get("/api/plans", params={"limit": 1, "offset": 1}).json()] == [first]
+    assert [t["plan_id"] for t in client.get(f"/api/plans/{first}/tasks").json()] == [first] * 3
+
+def test_unknown_plan_is_404(client):
+    assert client.get("/api/plans/999").status_code == 404
+    assert client.get("/api/plans/999/tasks").status_code == 404
+    assert client.post("/api/plans/999/tasks/reject").status_code == 404
+
+def test_task_transitions_update_plan_counters(client):
+    plan = create_plan(client, "v2")
+    task_ids = [t["task_id"] for t in plan["tasks"]]
+
+    assert client.post(f"/api/tasks/{task_ids[0]}/approve").status_code == 200
+    assert client.post(f"/api/tasks/{task_ids[1]}/reject").status_code == 200
+
+    assert plan_counters(client, plan["plan_id"]) == {
+        "total_tasks": 3, "pending_tasks": 1, "approved_tasks": 0,
+        "completed_tasks": 1, "failed_tasks": 0, "rejected_tasks": 1,
+    }
+
+def test_bulk_reject_moves_only_pending_tasks_of_the_plan(client):
+    plan = create_plan(client, "v2")
+    other = create_plan(client, "v3")
+    task_ids = [t["task_id"] for t in plan["tasks"]]
+    assert client.post(f"/api/tasks/{task_ids[0]}/approve").status_code == 200
+
+    response = client.post(f"/api/plans/{plan['plan_id']}/tasks/reject")
+    assert response.status_code == 200
+    assert sorted(response.json()["task_ids"]) == sorted(task_ids[1:])
+
+    statuses = {t["task_id"]: t["status"] for t in client.get(f"/api/plans/{plan['plan_id']}/tasks").json()}
+    assert statuses == {task_ids[0]: "completed", task_ids[1]: "rejected", task_ids[2]: "rejected"}
+    assert plan_counters(client, plan["plan_id"]) == {
+        "total_tasks": 3, "pending_tasks": 0, "approved_tasks": 0,
+        "completed_tasks": 1, "failed_tasks": 0, "rejected_tasks": 2,
+    }
+    assert plan_counters(client, other["plan_id"])["pending_tasks"] == 3
+    assert {t["status"] for t in client.get(f"/api/plans/{other['plan_id']}/tasks").json()} == {"pending"}
+
+    again = client.post(f"/api/plans/{plan['plan_id']}/tasks/reject")
+    assert again.json()["task_ids"] == []
+    assert plan_counters(client, plan["plan_id"])["rejected_tasks"] == 2
+
+def test_bulk_reject_statement_count_does_not_grow_with_tasks(client, test_engine):
+    plan_id = create_plan(client, "v2")["plan_id"]
+    statements = []
+
+    def record(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement.split()[0].upper())
+
+    event.listen(test_engine, "before_cursor_execute", record)
+    try:
+        assert len(client.post(f"/api/plans/{plan_id}/tasks/reject").json()["task_ids"]) == 3
+    finally:
+        event.remove(test_engine, "before_cursor_execute", record)
+
+    # One task UPDATE, one plan UPDATE and one upsert per (role, status) bucket: 2 roles x 2 buckets
+    assert statements.count("UPDATE") == 2
+    assert statements.count("INSERT") == 4
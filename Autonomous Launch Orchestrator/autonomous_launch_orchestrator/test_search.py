@@ -0,0 +1,86 @@
+#!/usr/bin/env python3
+"""
+Tests for full-text search on the SQLite FTS5 fallback
+"""
+
+from datetime import datetime
+
+import pytest
+from sqlalchemy import text
+
+from backend.app.db import database
+from backend.app.db.models import ExecutionLog, Task
+from backend.app.db.search import install_search_indexes
+
+TASKS = [
+    ("TASK-S-1", "developer", "pending", "Configure the deploy webhook"),
+    ("TASK-S-2", "marketing", "pending", "Announce the launch webhook webhook integration on the blog"),
+    ("TASK-S-3", "developer", "completed", "Document webhooks for partners"),
+    ("TASK-S-4", "sales", "pending", "Update the pricing sheet"),
+]
+
+@pytest.fixture
+def seeded(client):
+    now = datetime.utcnow()
+    db = database.SessionLocal()
+    try:
+        for task_id, role, status, description in TASKS:
+            db.add(Task(task_id=task_id, role=role, status=status, description=description, priority="medium", created_at=now, updated_at=now))
+        db.add(ExecutionLog(task_id="TASK-S-3", workflow_name="developer_default", execution_status="success", execution_details="webhook delivered", executed_at=now))
+        db.add(ExecutionLog(task_id="TASK-S-4", workflow_name="sales_default", execution_status="failed", execution_details="webhook timed out", executed_at=now))
+        db.commit()
+    finally:
+        db.close()
+    return client
+
+def search(client, **params):
+    response = client.get("/api/search", params=params)
+    assert response.status_code == 200
+    return response.json()
+
+def task_ids(body):
+    return [r["task_id"] for r in body["results"]]
+
+def test_search_stems_like_postgres(seeded):
+    # Porter stemming: singular and plural match each other
+    assert sorted(task_ids(search(seeded, q="webhooks"))) == ["TASK-S-1", "TASK-S-2", "TASK-S-3"]
+    assert sorted(task_ids(search(seeded, q="webhook"))) == ["TASK-S-1", "TASK-S-2", "TASK-S-3"]
+
+def test_search_is_ranked(seeded):
+    body = search(seeded, q="webhook")
+    assert body["total"] == 3
+    assert task_ids(body)[0] == "TASK-S-2"  # mentions it twice
+    ranks = [r["rank"] for r in body["results"]]
+    assert ranks == sorted(ranks, reverse=True)
+
+def test_search_terms_are_anded(seeded):
+    assert task_ids(search(seeded, q="deploy webhooks")) == ["TASK-S-1"]
+    assert search(seeded, q="deploy pricing")["total"] == 0
+
+def test_search_filters_and_pages(seeded):
+    assert sorted(task_ids(search(seeded, q="webhook", role="DEVELOPER"))) == ["TASK-S-1", "TASK-S-3"]
+    assert task_ids(search(seeded, q="webhook", role="developer", status="completed")) == ["TASK-S-3"]
+
+    page = search(seeded, q="webhook", limit=1, offset=1)
+    assert page["total"] == 3
+    assert len(page["results"]) == 1
+    assert page["results"][0]["task_id"] == task_ids(search(seeded, q="webhook"))[1]
+
+def test_search_logs_by_role_and_status(seeded):
+    assert sorted(task_ids(search(seeded, q="webhooks", scope="logs"))) == ["TASK-S-3", "TASK-S-4"]
+    assert task_ids(search(seeded, q="webhook", scope="logs", role="sales")) == ["TASK-S-4"]
+    assert task_ids(search(seeded, q="webhook", scope="logs", status="success")) == ["TASK-S-3"]
+
+def test_search_input_cannot_inject_fts_syntax(seeded):
+    assert search(seeded, q='webhook" OR "pricing')["total"] == 0
+    assert search(seeded, q="*")["total"] == 0
+
+def test_old_unstemmed_index_is_rebuilt(seeded, test_engine):
+    with test_engine.begin() as conn:
+        conn.execute(text("DROP TABLE tasks_fts"))
+        conn.execute(text("CREATE VIRTUAL TABLE tasks_fts USING fts5(description, content='tasks', content_rowid='id')"))
+        conn.execute(text("INSERT INTO tasks_fts(tasks_fts) VALUES ('rebuild')"))
+    assert task_ids(search(seeded, q="webhooks")) == ["TASK-S-3"]
+
+    install_search_indexes(test_engine)
+    assert sorted(task_ids(search(seeded, q="webhooks"))) == ["TASK-S-1", "TASK-S-2", "TASK-S-3"]
@@ -0,0 +1,124 @@
+#!/usr/bin/env python3
+"""
+Tests that the summary-table counters behind /api/stats match the tasks and execution_logs they summarise
+"""
+
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine, text
+
+import backend.app.api.endpoints as endpoints
+from backend.app.db import database
+from backend.app.main import app
+
+def counted_from_tables(engine):
+    """What /api/stats should report, computed with GROUP BY over the history tables."""
+    with engine.connect() as conn:
+        tasks = {
+            (role, status): count
+            for role, status, count in conn.execute(text("SELECT role, status, count(*) FROM tasks GROUP BY role, status"))
+        }
+        workflows = {
+            name: (executions, successes)
+            for name, executions, successes in conn.execute(text(
+                "SELECT workflow_name, count(*), sum(CASE WHEN execution_status = 'success' THEN 1 ELSE 0 END) "
+                "FROM execution_logs GROUP BY workflow_name"
+            ))
+        }
+    return tasks, workflows
+
+def counted_from_stats(client):
+    stats = client.get("/api/stats").json()
+    tasks = {(row["role"], row["status"]): row["count"] for row in stats["tasks_by_role_status"]}
+    workflows = {w["workflow_name"]: (w["executions"], w["successes"]) for w in stats["workflows"]}
+    assert stats["total_tasks"] == sum(tasks.values())
+    return tasks, workflows
+
+def plan_counts_from_tables(engine, plan_id):
+    with engine.connect() as conn:
+        rows = conn.execute(text("SELECT status, count(*) FROM tasks WHERE plan_id = :id GROUP BY status"), {"id": plan_id})
+        counts = {f"{status}_tasks": count for status, count in rows}
+    return {k: counts.get(k, 0) for k in ("pending_tasks", "approved_tasks", "completed_tasks", "failed_tasks", "rejected_tasks")}
+
+def assert_counters_match(client, engine):
+    assert counted_from_stats(client) == counted_from_tables(engine)
+    for plan in client.get("/api/plans").json():
+        expected = plan_counts_from_tables(engine, plan["id"])
+        assert {k: plan[k] for k in expected} == expected
+        assert plan["total_tasks"] == sum(expected.values())
+
+def test_counters_follow_every_transition(client, test_engine, monkeypatch):
+    first = client.post("/api/create-plan", params={"goal": "v2"}).json()
+    second = client.post("/api/create-plan", params={"goal": "v3"}).json()
+    first_ids = [t["task_id"] for t in first["tasks"]]
+    assert_counters_match(client, test_engine)
+
+    assert client.post(f"/api/tasks/{first_ids[0]}/approve").status_code == 200
+    assert_counters_match(client, test_engine)
+
+    monkeypatch.setattr(endpoints.get_n8n_integration(), "trigger_workflow", lambda workflow, data: {"status": "failed"})
+    response = client.post(f"/api/tasks/{first_ids[1]}/approve")
+    assert response.json()["execution_result"]["status"] == "failed"
+    assert_counters_match(client, test_engine)
+
+    assert client.post(f"/api/tasks/{first_ids[2]}/reject").status_code == 200
+    assert_counters_match(client, test_engine)
+
+    assert client.post(f"/api/plans/{second['plan_id']}/tasks/reject").status_code == 200
+    assert_counters_match(client, test_engine)
+
+    tasks, workflows = counted_from_stats(client)
+    assert tasks == {("marketing", "completed"): 1, ("legal", "failed"): 1, ("marketing", "rejected"): 3, ("legal", "rejected"): 1}
+    assert sorted(workflows.values()) == [(1, 0), (1, 1)]
+
+def test_rejected_transitions_leave_counters_alone(client, test_engine):
+    task_id = client.post("/api/create-plan", params={"goal": "v2"}).json()["tasks"][0]["task_id"]
+    assert client.post(f"/api/tasks/{task_id}/reject").status_code == 200
+    assert client.post(f"/api/tasks/{task_id}/reject").status_code == 409
+    assert client.post(f"/api/tasks/{task_id}/approve").status_code == 409
+    assert_counters_match(client, test_engine)
+
+def test_existing_database_is_backfilled(tmp_path, monkeypatch, calls):
+    # A database written before plans and the summary tables existed
+    engine = create_engine(f"sqlite:///{tmp_path / 'old.db'}", connect_args={"check_same_thread": False})
+    with engine.begin() as conn:
+        conn.execute(text(
+            "CREATE TABLE tasks (id INTEGER PRIMARY KEY, task_id VARCHAR(64) UNIQUE NOT NULL, role VARCHAR(64) NOT NULL, "
+            "description TEXT NOT NULL, deadline DATETIME, priority VARCHAR(16), status VARCHAR(32), "
+            "created_at DATETIME NOT NULL, updated_at DATETIME NOT NULL)"
+        ))
+        conn.execute(text(
+            "CREATE TABLE execution_logs (id INTEGER PRIMARY KEY, task_id VARCHAR(64) NOT NULL, workflow_name VARCHAR(128) NOT NULL, "
+            "execution_status VARCHAR(32) NOT NULL, execution_details TEXT, executed_at DATETIME NOT NULL)"
+        ))
+        for i, (role, status) in enumerate([("marketing", "completed"), ("marketing", "pending"), ("legal", "failed"), ("sales", "completed")]):
+            conn.execute(text(
+                "INSERT INTO tasks (task_id, role, description, priority, status, created_at, updated_at) "
+                "VALUES (:task_id, :role, 'old task', 'medium', :status, '2024-01-01', '2024-01-01')"
+            ), {"task_id": f"TASK-OLD-{i}", "role": role, "status": status})
+            if status != "pending":
+                conn.execute(text(
+                    "INSERT INTO execution_logs (task_id, workflow_name, execution_status, executed_at) "
+                    "VALUES (:task_id, :workflow, :status, '2024-01-01')"
+                ), {"task_id": f"TASK-OLD-{i}", "workflow": f"{role}_default", "status": "success" if status == "completed" else "failed"})
+
+    monkeypatch.setattr(database, "engine", engine)
+    database.SessionLocal.configure(bind=engine)
+    try:
+        # Startup migrates the schema and backfills the summary tables
+        with TestClient(app) as client:
+            assert_counters_match(client, engine)
+            tasks, workflows = counted_from_stats(client)
+            assert tasks[("marketing", "completed")] == 1
+            assert workflows == {"legal_default": (1, 0), "marketing_default": (1, 1), "sales_default": (1, 1)}
+
+            # Counters keep up with new work on top of the backfill
+            assert client.post("/api/tasks/TASK-OLD-1/approve").status_code == 200
+            assert client.post("/api/create-plan", params={"goal": "v2"}).status_code == 200
+            assert_counters_match(client, engine)
+
+        # A second startup must not backfill again on top of the live counters
+        with TestClient(app) as client:
+            assert_counters_match(client, engine)
+    finally:
+        database.SessionLocal.configure(bind=None)
+        engine.dispose()